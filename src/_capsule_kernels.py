@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Numba-compiled containment kernels for tapered capsules.
+Optional: importers fall back to the NumPy batch paths when numba is missing.
+"""
+
+import numpy as np
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, cache=True, fastmath=True)
+    def points_in_capsules(points, p1s, p2s, radii_top, radii_bottom, out):
+        """Containment of N points against K tapered capsules in one fused
+        pass: for each point, project onto every capsule axis, clamp, and
+        compare squared distance to the interpolated radius. Writes a (K, N)
+        boolean matrix into out."""
+        for i in numba.prange(points.shape[0]):
+            px, py, pz = points[i, 0], points[i, 1], points[i, 2]
+            for k in range(p1s.shape[0]):
+                ax = p2s[k, 0] - p1s[k, 0]
+                ay = p2s[k, 1] - p1s[k, 1]
+                az = p2s[k, 2] - p1s[k, 2]
+                length_sq = ax * ax + ay * ay + az * az
+
+                dx = px - p1s[k, 0]
+                dy = py - p1s[k, 1]
+                dz = pz - p1s[k, 2]
+
+                if length_sq < 1e-16:
+                    # Degenerate axis - treat as sphere
+                    r = max(radii_top[k], radii_bottom[k])
+                    out[k, i] = dx * dx + dy * dy + dz * dz <= r * r
+                    continue
+
+                t = (dx * ax + dy * ay + dz * az) / length_sq
+                if t < 0.0:
+                    t = 0.0
+                elif t > 1.0:
+                    t = 1.0
+
+                cx = dx - t * ax
+                cy = dy - t * ay
+                cz = dz - t * az
+                r = radii_bottom[k] + t * (radii_top[k] - radii_bottom[k])
+                out[k, i] = cx * cx + cy * cy + cz * cz <= r * r
+
+    @numba.njit(cache=True, fastmath=True)
+    def minmax3(vertices):
+        """Per-axis min and max of an (N, 3) array in a single pass,
+        halving the memory traffic of separate min()/max() reductions."""
+        lo = np.empty(3)
+        hi = np.empty(3)
+        for j in range(3):
+            lo[j] = vertices[0, j]
+            hi[j] = vertices[0, j]
+        for i in range(1, vertices.shape[0]):
+            for j in range(3):
+                v = vertices[i, j]
+                if v < lo[j]:
+                    lo[j] = v
+                elif v > hi[j]:
+                    hi[j] = v
+        return lo, hi
+
+    # Warm the JIT at import with tiny problems so the first real call
+    # isn't a compile hit (cache=True keeps this cheap across processes)
+    points_in_capsules(
+        np.zeros((1, 3)), np.zeros((1, 3)), np.ones((1, 3)),
+        np.ones(1), np.ones(1), np.zeros((1, 1), dtype=np.bool_)
+    )
+    minmax3(np.zeros((1, 3)))
+else:
+    points_in_capsules = None
+    minmax3 = None
@@ -10,15 +10,80 @@ class CapsuleGenerator:
         self.bone_rotations = bone_rotations
         self.bone_directions = bone_directions
         self.vrm_humanoid_bones = vrm_humanoid_bones
+        # Caches the last bone selection: (bone_geometry identity, the
+        # max_capsules it was computed for, the selected bones)
+        self._selection_cache = None
 
     def analyze_bone_geometry(self, vertices: List[List[float]], bone_weights: List[List[float]], bone_indices: List[List[int]]) -> Dict[str, Dict]:
-        """Analyze geometry associated with each bone for capsule generation."""
+        """Analyze geometry associated with each bone for capsule generation.
+
+        Each bone's "vertices"/"weights" come back as NumPy arrays, so
+        downstream bounds and distance math runs on contiguous data instead
+        of per-row Python lists."""
         bone_geometry = {}
-        
-        if not vertices or not bone_weights:
+
+        if len(vertices) == 0 or len(bone_weights) == 0:
             print("No vertex or weight data available")
             return bone_geometry
-        
+
+        # glTF influence lists are rectangular (4 weights/joints per
+        # vertex), so the dominant-bone grouping vectorizes: one argmax
+        # picks the winning influence per vertex, one stable sort groups
+        # the survivors by bone. Ragged rows fall back to the row loop.
+        try:
+            verts = np.asarray(vertices, dtype=np.float64)
+            weights = np.asarray(bone_weights, dtype=np.float64)
+            joints = np.asarray(bone_indices, dtype=np.int64)
+        except ValueError:
+            return self._analyze_bone_geometry_rows(vertices, bone_weights, bone_indices)
+        if (verts.ndim != 2 or weights.ndim != 2 or joints.ndim != 2
+                or weights.shape[1] == 0 or joints.shape[1] != weights.shape[1]):
+            return self._analyze_bone_geometry_rows(vertices, bone_weights, bone_indices)
+
+        # zip() semantics: only rows present in all three inputs count
+        n = min(len(verts), len(weights), len(joints))
+        verts, weights, joints = verts[:n], weights[:n], joints[:n]
+
+        rows = np.arange(n)
+        dominant = np.argmax(weights, axis=1)
+        max_weight = weights[rows, dominant]
+        bone_idx = joints[rows, dominant]
+        keep = (max_weight >= 0.1) & (bone_idx < len(self.joint_names))
+
+        kept_rows = rows[keep]
+        kept_bones = bone_idx[keep]
+        order = np.argsort(kept_bones, kind="stable")
+        sorted_rows = kept_rows[order]
+        sorted_bones = kept_bones[order]
+        boundaries = np.nonzero(np.diff(sorted_bones))[0] + 1
+
+        # Insert bones in first-appearance order, matching the row loop, so
+        # downstream tie-breaking on dict order is unchanged. The stable
+        # sort keeps each segment's rows ascending, so segment[0] is the
+        # bone's first vertex.
+        segments = [s for s in np.split(sorted_rows, boundaries) if len(s)]
+        segments.sort(key=lambda s: s[0])
+
+        for segment in segments:
+            bone_name = self.joint_names[bone_idx[segment[0]]]
+            segment_verts = verts[segment]
+            bounds_min = segment_verts.min(axis=0)
+            bounds_max = segment_verts.max(axis=0)
+            bone_geometry[bone_name] = {
+                "vertices": segment_verts,
+                "weights": max_weight[segment],
+                "bounds": {"min": bounds_min.tolist(), "max": bounds_max.tolist()},
+                "center": ((bounds_min + bounds_max) / 2).tolist(),
+                "size": (bounds_max - bounds_min).tolist(),
+            }
+
+        return bone_geometry
+
+    def _analyze_bone_geometry_rows(self, vertices, bone_weights, bone_indices) -> Dict[str, Dict]:
+        """Row-at-a-time grouping for inputs the vectorized path can't
+        batch (ragged per-vertex influence lists)."""
+        bone_geometry = {}
+
         # Group vertices by dominant bone influence
         for i, (vertex, weights, joints) in enumerate(zip(vertices, bone_weights, bone_indices)):
             if not weights or not joints:
@@ -52,31 +117,37 @@ class CapsuleGenerator:
             bone_geometry[bone_name]["vertices"].append(vertex)
             bone_geometry[bone_name]["weights"].append(max_weight)
         
-        # Calculate bounds for each bone's geometry
+        # Calculate bounds for each bone's geometry, converting to the same
+        # array-valued entries the vectorized path produces
         for bone_name, data in bone_geometry.items():
             if data["vertices"]:
-                vertices_array = np.array(data["vertices"])
-                data["bounds"]["min"] = np.min(vertices_array, axis=0).tolist()
-                data["bounds"]["max"] = np.max(vertices_array, axis=0).tolist()
-                data["center"] = ((np.array(data["bounds"]["min"]) + np.array(data["bounds"]["max"])) / 2).tolist()
-                data["size"] = (np.array(data["bounds"]["max"]) - np.array(data["bounds"]["min"])).tolist()
-        
+                vertices_array = np.array(data["vertices"], dtype=np.float64)
+                bounds_min = vertices_array.min(axis=0)
+                bounds_max = vertices_array.max(axis=0)
+                data["vertices"] = vertices_array
+                data["weights"] = np.array(data["weights"], dtype=np.float64)
+                data["bounds"]["min"] = bounds_min.tolist()
+                data["bounds"]["max"] = bounds_max.tolist()
+                data["center"] = ((bounds_min + bounds_max) / 2).tolist()
+                data["size"] = (bounds_max - bounds_min).tolist()
+
         return bone_geometry
 
-    def generate_capsule_constraints(self, bone_geometry: Dict[str, Dict], max_capsules: int = 25, integer_scale: int = None, fast_mode: bool = False) -> str:
-        """Generate MiniZinc constraint data for capsule optimization.
-        
-        Args:
-            bone_geometry: Analyzed bone geometry data
-            max_capsules: Maximum number of capsules to generate
-            integer_scale: If provided, scale float values to integers (e.g., 1000 for 1mm precision)
-            fast_mode: If True, generate simplified data for fast optimization
-        """
-        if not bone_geometry:
-            print("No bone geometry data available")
-            return ""
-        
-        # Prioritize VRM humanoid bones, then fall back to high vertex count bones
+    def _select_significant_bones(self, bone_geometry, max_capsules):
+        """Pick up to max_capsules bones, prioritizing VRM humanoid bones and
+        high vertex counts while deprioritizing clothing/accessory bones.
+
+        Candidates are appended in an order that does not depend on
+        max_capsules, so a selection for N capsules is always a prefix of the
+        selection for M >= N. The last (largest) selection is cached and
+        smaller requests are served as slices of it, which lets progressive
+        optimization attempts specialize their data without re-ranking the
+        bones every time."""
+        cached = self._selection_cache
+        if (cached is not None and cached[0] is bone_geometry
+                and max_capsules <= cached[1]):
+            return cached[2][:max_capsules]
+
         prioritized_bones = []
         remaining_bones = list(bone_geometry.items())
         
@@ -166,7 +237,32 @@ class CapsuleGenerator:
                 prioritized_bones.append((bone_name, bone_data))
         
         significant_bones = prioritized_bones[:max_capsules]
+        self._selection_cache = (bone_geometry, max_capsules, significant_bones)
+        return significant_bones
+
+    def get_bone_bounds(self, bone_geometry, max_capsules=25):
+        """Centers and sizes of the selected bones as float arrays, in the
+        same order as the generated constraint data."""
+        significant_bones = self._select_significant_bones(bone_geometry, max_capsules)
+        centers = np.array([data["center"] for _, data in significant_bones], dtype=np.float64)
+        sizes = np.array([data["size"] for _, data in significant_bones], dtype=np.float64)
+        return centers, sizes
+
+    def generate_capsule_constraints(self, bone_geometry: Dict[str, Dict], max_capsules: int = 25, integer_scale: int = None, fast_mode: bool = False) -> str:
+        """Generate MiniZinc constraint data for capsule optimization.
+        
+        Args:
+            bone_geometry: Analyzed bone geometry data
+            max_capsules: Maximum number of capsules to generate
+            integer_scale: If provided, scale float values to integers (e.g., 1000 for 1mm precision)
+            fast_mode: If True, generate simplified data for fast optimization
+        """
+        if not bone_geometry:
+            print("No bone geometry data available")
+            return ""
         
+        significant_bones = self._select_significant_bones(bone_geometry, max_capsules)
+
         constraints = []
         if fast_mode:
             constraints.append(f"% Generated from VRM mesh analysis (FAST MODE)")
@@ -320,31 +320,37 @@ class CapsuleSkinningSystem:
         Returns:
             Tuple of (joints_data, weights_data) as uint16 and float32 arrays
         """
-        n_vertices = len(bone_weights)
-        
-        # Prepare JOINTS_0 data (4 bone indices per vertex, uint16)
-        joints_data = np.zeros((n_vertices, 4), dtype=np.uint16)
-        weights_data = np.zeros((n_vertices, 4), dtype=np.float32)
-        
-        for i in range(n_vertices):
-            # Get weights and indices for this vertex
-            vertex_weights = bone_weights[i]
-            vertex_indices = bone_indices[i]
-            
-            # Sort by weight (descending) and take top 4
-            weight_order = np.argsort(vertex_weights)[::-1]
-            
-            # Fill up to 4 influences
-            for j in range(min(4, len(weight_order))):
-                if vertex_weights[weight_order[j]] > 0.001:
-                    joints_data[i, j] = vertex_indices[weight_order[j]]
-                    weights_data[i, j] = vertex_weights[weight_order[j]]
-        
+        bone_weights = np.asarray(bone_weights)
+        bone_indices = np.asarray(bone_indices)
+        n_vertices, n_influences = bone_weights.shape
+
+        # Select the top influences per vertex in one vectorized pass
+        # (argpartition avoids a full per-vertex sort; glTF does not require
+        # influences to be ordered)
+        if n_influences > max_influences:
+            top_idx = np.argpartition(-bone_weights, max_influences, axis=1)[:, :max_influences]
+        else:
+            top_idx = np.broadcast_to(np.arange(n_influences), (n_vertices, n_influences))
+
+        weights_data = np.take_along_axis(bone_weights, top_idx, axis=1).astype(np.float32, copy=False)
+        joints_data = np.take_along_axis(bone_indices, top_idx, axis=1).astype(np.uint16, copy=False)
+
+        # Drop negligible influences (matches the old per-vertex threshold)
+        negligible = weights_data <= 0.001
+        weights_data = np.where(negligible, np.float32(0.0), weights_data)
+        joints_data = np.where(negligible, np.uint16(0), joints_data)
+
+        # Pad out to the glTF influence count if the input had fewer
+        if weights_data.shape[1] < max_influences:
+            pad = max_influences - weights_data.shape[1]
+            weights_data = np.pad(weights_data, ((0, 0), (0, pad)))
+            joints_data = np.pad(joints_data, ((0, 0), (0, pad)))
+
         # Normalize weights to sum to 1.0 per vertex
         row_sums = np.sum(weights_data, axis=1, keepdims=True)
-        row_sums = np.maximum(row_sums, 1e-10)
+        row_sums = np.maximum(row_sums, np.float32(1e-10))
         weights_data = weights_data / row_sums
-        
+
         return joints_data, weights_data
     
     def create_skin_object(self,
@@ -389,10 +395,10 @@ class CapsuleSkinningSystem:
             Tuple of (smoothed_weights, bone_indices)
         """
         # Extract original mesh data
-        orig_vertices = np.array(original_mesh_data['vertices'])
-        orig_faces = np.array(original_mesh_data['faces'])
-        orig_weights = np.array(original_mesh_data['bone_weights'])
-        orig_indices = np.array(original_mesh_data['bone_indices'])
+        orig_vertices = np.asarray(original_mesh_data['vertices'], dtype=np.float32)
+        orig_faces = np.asarray(original_mesh_data['faces'], dtype=np.int32)
+        orig_weights = np.asarray(original_mesh_data['bone_weights'], dtype=np.float32)
+        orig_indices = np.asarray(original_mesh_data['bone_indices'], dtype=np.int32)
         
         print(f"Transferring weights from {len(orig_vertices)} original vertices to {len(capsule_vertices)} capsule vertices")
         
@@ -13,6 +13,7 @@ import numpy as np
 from pathlib import Path
 from typing import List, Dict, Tuple, Any
 from sklearn.decomposition import PCA
+from ._capsule_kernels import minmax3, points_in_capsules
 
 class CoACDCapsulePipeline:
     """Pipeline for generating optimized tapered capsules using CoACD decomposition."""
@@ -432,21 +433,34 @@ class CoACDCapsulePipeline:
         # Initialize coverage matrix
         coverage_matrix = np.zeros((num_capsules, num_points), dtype=bool)
         
-        # Check which capsules contain which points using capsule-based checking
-        for i, capsule in enumerate(capsules):
-            p1 = np.array(capsule['p1'])
-            p2 = np.array(capsule['p2'])
-            radius_top = capsule['radius_top']
-            radius_bottom = capsule['radius_bottom']
-            
-            for j, point in enumerate(witness_points):
-                # Check if point is inside the tapered capsule
-                if self._point_in_tapered_capsule(point, p1, p2, radius_top, radius_bottom):
-                    coverage_matrix[i, j] = True
+        # Check which capsules contain which points, one vectorized
+        # containment test per capsule instead of a Python call per point
+        witness_points = np.ascontiguousarray(witness_points, dtype=np.float64)
+        if points_in_capsules is not None and num_capsules > 0 and num_points > 0:
+            # Numba kernel: all capsules against all points in one fused,
+            # parallel pass with no intermediate arrays
+            p1s = np.array([c['p1'] for c in capsules], dtype=np.float64)
+            p2s = np.array([c['p2'] for c in capsules], dtype=np.float64)
+            radii_top = np.array([c['radius_top'] for c in capsules], dtype=np.float64)
+            radii_bottom = np.array([c['radius_bottom'] for c in capsules], dtype=np.float64)
+            points_in_capsules(witness_points, p1s, p2s,
+                               radii_top, radii_bottom, coverage_matrix)
+        else:
+            for i, capsule in enumerate(capsules):
+                p1 = np.array(capsule['p1'])
+                p2 = np.array(capsule['p2'])
+                radius_top = capsule['radius_top']
+                radius_bottom = capsule['radius_bottom']
+
+                coverage_matrix[i] = self._points_in_tapered_capsule(
+                    witness_points, p1, p2, radius_top, radius_bottom
+                )
         
         print(f"  Built {num_capsules}x{num_points} coverage matrix")
         print(f"  Total covered points: {np.sum(np.any(coverage_matrix, axis=0))}/{num_points}")
-        return coverage_matrix
+        # Bit-pack the boolean rows so the matrix held between steps is
+        # 8x smaller; create_minizinc_data_file unpacks at emission time
+        return np.packbits(coverage_matrix, axis=1)
     
     def _point_to_line_segment_distance(self, point: np.ndarray, p1: np.ndarray, p2: np.ndarray) -> float:
         """Calculate distance from point to line segment."""
@@ -475,41 +489,46 @@ class CoACDCapsulePipeline:
         # Distance from point to closest point
         return np.linalg.norm(point - closest_point)
     
-    def _point_in_tapered_capsule(self, point: np.ndarray, p1: np.ndarray, p2: np.ndarray, 
-                                 radius_top: float, radius_bottom: float) -> bool:
-        """Check if a point is inside a tapered capsule defined by two endpoints and radii."""
+    def _points_in_tapered_capsule(self, points: np.ndarray, p1: np.ndarray, p2: np.ndarray,
+                                   radius_top: float, radius_bottom: float) -> np.ndarray:
+        """Check which of an (N, 3) batch of points lie inside a tapered
+        capsule defined by two endpoints and radii. One broadcast pass over
+        the batch replaces a Python-level call per point."""
+        points = np.asarray(points, dtype=np.float64)
+
         # Vector from p1 to p2
         line_vec = p2 - p1
         line_len = np.linalg.norm(line_vec)
-        
+
         if line_len < 1e-8:
-            # Degenerate case - treat as sphere
-            return np.linalg.norm(point - p1) <= max(radius_top, radius_bottom)
-        
-        # Normalize line vector
-        line_unit = line_vec / line_len
-        
-        # Vector from p1 to point
-        point_vec = point - p1
-        
-        # Project point_vec onto line_vec
-        projection_length = np.dot(point_vec, line_unit)
-        
-        # Clamp projection to line segment
-        projection_length = np.clip(projection_length, 0, line_len)
-        
-        # Closest point on line segment
-        closest_point = p1 + projection_length * line_unit
-        
-        # Distance from point to closest point on line segment
-        distance_to_axis = np.linalg.norm(point - closest_point)
-        
-        # Interpolate radius at this point along the capsule
-        t = projection_length / line_len if line_len > 0 else 0
-        current_radius = radius_bottom + t * (radius_top - radius_bottom)
-        
-        # Point is inside if distance to axis is less than or equal to current radius
-        return distance_to_axis <= current_radius
+            # Degenerate case - treat as sphere; compare squared distances
+            # so no sqrt is needed
+            diff = points - p1
+            radius = max(radius_top, radius_bottom)
+            return np.einsum('ij,ij->i', diff, diff) <= radius * radius
+
+        # Project each point onto the axis, as a 0..1 fraction of its length
+        t = np.clip((points - p1) @ line_vec / (line_len * line_len), 0.0, 1.0)
+
+        # Squared distance from each point to its closest point on the
+        # segment; einsum skips both the sqrt and a temporary for the sum
+        diff = points - (p1 + t[:, None] * line_vec)
+        dist_sq = np.einsum('ij,ij->i', diff, diff)
+
+        # Interpolate the radius along the capsule
+        current_radii = radius_bottom + t * (radius_top - radius_bottom)
+
+        # A point is inside if its squared distance to the axis is within
+        # the squared radius
+        return dist_sq <= current_radii * current_radii
+
+    def _point_in_tapered_capsule(self, point: np.ndarray, p1: np.ndarray, p2: np.ndarray,
+                                 radius_top: float, radius_bottom: float) -> bool:
+        """Check if a single point is inside a tapered capsule."""
+        result = self._points_in_tapered_capsule(
+            np.asarray(point, dtype=np.float64)[None, :], p1, p2, radius_top, radius_bottom
+        )
+        return bool(result[0])
     
     def create_minizinc_data_file(self, capsules: List[Dict[str, Any]], 
                                  witness_points: np.ndarray, 
@@ -560,6 +579,10 @@ class CoACDCapsulePipeline:
                 
                 # Write coverage matrix (as a flattened array)
                 f.write("% Coverage matrix\n")
+                if coverage_matrix.dtype == np.uint8:
+                    # Rows arrive bit-packed from build_coverage_matrix
+                    coverage_matrix = np.unpackbits(coverage_matrix, axis=1,
+                                                    count=len(witness_points))
                 coverage_flat = coverage_matrix.flatten().astype(int).tolist()
                 f.write(f"coverage_matrix = array2d(1..{len(capsules)}, 1..{len(witness_points)}, [{', '.join(map(str, coverage_flat))}]);\n")
             
@@ -585,15 +608,18 @@ class CoACDCapsulePipeline:
                 data_path
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            
+            # Results go to output_path via -o; stdout is noise and stderr
+            # only matters on failure, so keep it as bytes until then
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE, timeout=300)
+
             if result.returncode == 0:
                 print(f"  Optimization completed successfully")
                 print(f"  Results saved to: {output_path}")
                 return True
             else:
                 print(f"  Optimization failed with return code {result.returncode}")
-                print(f"  Error: {result.stderr}")
+                print(f"  Error: {result.stderr.decode(errors='replace')}")
                 return False
         except subprocess.TimeoutExpired:
             print("  Optimization timed out")
@@ -706,10 +732,17 @@ class CoACDCapsulePipeline:
                     return points, np.arange(num_points)
                 return points
         
-        # Create mock mesh with vertices from mesh_data_extractor
-        vertices = np.array(self.mesh_data_extractor.get_vertices())
+        # Create mock mesh with vertices from mesh_data_extractor; asarray
+        # is a no-copy pass-through when the extractor already returns one
+        vertices = np.asarray(self.mesh_data_extractor.get_vertices())
         if len(vertices) > 0:
-            bounds = np.array([np.min(vertices, axis=0), np.max(vertices, axis=0)])
+            if minmax3 is not None:
+                # Fused single-pass reduction instead of two full scans
+                bounds = np.array(minmax3(np.ascontiguousarray(vertices, dtype=np.float64)))
+            else:
+                bounds = np.empty((2, 3))
+                np.min(vertices, axis=0, out=bounds[0])
+                np.max(vertices, axis=0, out=bounds[1])
         else:
             bounds = np.array([[-1, -1, -1], [1, 1, 1]])
         
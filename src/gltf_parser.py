@@ -1,8 +1,15 @@
+import mmap
+import os
 import struct
 import json
 import base64
 from typing import Dict, List, Any
 
+# Parsed GLB files keyed by (path, mtime); re-testing the same asset (or
+# several pipelines over one file) then skips disk I/O and JSON parsing.
+# Cached entries are shared, so callers must not mutate gltf_data in place.
+_GLB_CACHE: Dict[tuple, tuple] = {}
+
 class GLTFParser:
     def __init__(self):
         self.gltf_data: Dict[str, Any] = {}
@@ -11,28 +18,33 @@ class GLTFParser:
     def load_glb(self, file_path: str) -> bool:
         """Load binary GLTF file."""
         try:
-            with open(file_path, 'rb') as file:
-                # Read header
-                magic = struct.unpack('4s', file.read(4))[0]
-                version = struct.unpack('I', file.read(4))[0]
-                length = struct.unpack('I', file.read(4))[0]
-                
-                # Read JSON chunk
-                json_chunk_length = struct.unpack('I', file.read(4))[0]
-                json_chunk_type = struct.unpack('4s', file.read(4))[0]
-                self.gltf_data = json.loads(file.read(json_chunk_length).decode('utf-8'))
-                
-                # Read binary chunk if exists
-                if file.tell() < length:
-                    bin_chunk_length = struct.unpack('I', file.read(4))[0]
-                    bin_chunk_type = struct.unpack('4s', file.read(4))[0]
-                    bin_data = file.read(bin_chunk_length)
-                    
-                    # Store binary data as buffer
-                    self.buffers = [bin_data]
-                
-                self._extract_buffers()
+            cache_key = (file_path, os.stat(file_path).st_mtime_ns)
+            cached = _GLB_CACHE.get(cache_key)
+            if cached is not None:
+                self.gltf_data, self.buffers = cached
                 return True
+
+            # Map the file instead of streaming read() calls; only the
+            # chunks actually sliced out are copied into Python bytes
+            with open(file_path, 'rb') as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Read header
+                    magic, version, length = struct.unpack_from('<4sII', mm, 0)
+
+                    # Read JSON chunk
+                    json_chunk_length, json_chunk_type = struct.unpack_from('<II', mm, 12)
+                    self.gltf_data = json.loads(mm[20:20 + json_chunk_length])
+
+                    # Read binary chunk if exists
+                    offset = 20 + json_chunk_length
+                    if offset < length:
+                        bin_chunk_length, bin_chunk_type = struct.unpack_from('<II', mm, offset)
+                        # Store binary data as buffer
+                        self.buffers = [mm[offset + 8:offset + 8 + bin_chunk_length]]
+
+            self._extract_buffers()
+            _GLB_CACHE[cache_key] = (self.gltf_data, self.buffers)
+            return True
         except Exception as e:
             print(f"Error loading GLB file: {e}")
             return False
@@ -43,9 +55,13 @@ class GLTFParser:
             for buffer in self.gltf_data["buffers"]:
                 if "uri" in buffer:
                     if buffer["uri"].startswith("data:"):
-                        # Base64 embedded data
-                        data_start = buffer["uri"].find(",") + 1
-                        buffer_data = base64.b64decode(buffer["uri"][data_start:])
+                        # Base64 embedded data. Encode the URI once and
+                        # slice it as a memoryview: b64decode then works on
+                        # bytes directly instead of first copying the
+                        # payload substring and re-encoding it internally
+                        uri_bytes = buffer["uri"].encode('ascii')
+                        data_start = uri_bytes.find(b",") + 1
+                        buffer_data = base64.b64decode(memoryview(uri_bytes)[data_start:])
                         self.buffers.append(buffer_data)
                     else:
                         # External file - for now just placeholder
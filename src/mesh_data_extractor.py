@@ -146,8 +146,12 @@ class MeshDataExtractor:
     def get_vertices(self) -> List[List[float]]:
         return self.vertices
 
-    def get_triangles(self) -> List[List[int]]:
-        return self.triangles
+    def get_triangles(self) -> np.ndarray:
+        """Triangle indices as a contiguous (F, 3) uint32 array, so callers
+        can hand them to NumPy/trimesh without a per-row list conversion."""
+        if len(self.triangles):
+            return np.ascontiguousarray(self.triangles, dtype=np.uint32)
+        return np.empty((0, 3), dtype=np.uint32)
 
     def get_normals(self) -> List[List[float]]:
         return self.normals
@@ -4,8 +4,12 @@ Convert MiniZinc tapered capsule optimization output to glTF format.
 Can ingest existing VRM1 models and replace with optimized capsule geometry.
 """
 
+import functools
 import json
 import math
+import mmap
+import os
+import shutil
 import sys
 import re
 import base64
@@ -14,8 +18,298 @@ import numpy as np
 from typing import List, Dict, Tuple, Any
 from .capsule_skinning import CapsuleSkinningSystem
 
+# Try to use orjson for the JSON-heavy load/save paths, fall back to stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_loads(data):
+    """Parse JSON from str or bytes with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=64)
+def _unit_capsule_mesh(r1_ratio: float, r2_ratio: float, segments: int):
+    """Build a unit-length capsule mesh for the given radius-to-length ratios.
+
+    Uniform scaling preserves capsule geometry (and normals) exactly, so all
+    capsules sharing a rounded (radius1/length, radius2/length) profile can
+    reuse one cached mesh instead of regenerating vertices per capsule.
+    """
+    mesh = _build_capsule_mesh(1.0, r1_ratio, r2_ratio, segments)
+    return (
+        # float32 matches the glTF accessor format, halving memory traffic
+        np.array(mesh['vertices'], dtype=np.float32),
+        mesh['normals'],
+        mesh['indices']
+    )
+
+
+def _build_capsule_mesh(length: float, radius1: float, radius2: float,
+                    segments: int = 16) -> Dict[str, Any]:
+    """Generate raw capsule mesh geometry (vertices, normals, indices)."""
+    vertices = []
+    normals = []
+    indices = []
+    
+    # Generate tapered cylinder body with multiple rings for smooth tapering
+    cylinder_rings = 8  # Number of rings along the cylinder for smooth tapering
+    
+    for ring in range(cylinder_rings + 1):
+        # Interpolate position and radius along the cylinder
+        t = ring / cylinder_rings  # 0 to 1 from bottom to top
+        y_pos = -length / 2 + t * length  # Centered at origin
+        
+        # Linear interpolation between bottom and top radius
+        current_radius = radius1 + t * (radius2 - radius1)
+        
+        for i in range(segments):
+            theta = i * 2 * math.pi / segments
+            cos_theta = math.cos(theta)
+            sin_theta = math.sin(theta)
+            
+            x = current_radius * cos_theta  # No position offset
+            y = y_pos
+            z = current_radius * sin_theta  # No position offset
+            vertices.extend([x, y, z])
+            
+            # Calculate normal for tapered surface
+            # For tapered cylinder, normal needs to account for the slope
+            radius_diff = radius2 - radius1
+            slope_factor = radius_diff / length if length > 0 else 0
+            
+            # Normal vector accounting for taper
+            nx = cos_theta
+            ny = slope_factor  # Y component based on taper
+            nz = sin_theta
+            
+            # Normalize the normal vector
+            normal_length = math.sqrt(nx*nx + ny*ny + nz*nz)
+            if normal_length > 0:
+                nx /= normal_length
+                ny /= normal_length
+                nz /= normal_length
+            
+            normals.extend([nx, ny, nz])
+    
+    # Generate bottom hemisphere (using radius1)
+    hemisphere_segments = segments // 2
+    
+    # Add bottom cap center vertex
+    vertices.extend([0, -length / 2, 0])
+    normals.extend([0, -1, 0])
+    bottom_center_idx = len(vertices) // 3 - 1
+    
+    for j in range(1, hemisphere_segments + 1):
+        phi = -math.pi / 2 + j * (math.pi / 2) / hemisphere_segments
+        y_offset = radius1 * math.sin(phi)
+        radius_at_phi = radius1 * math.cos(phi)
+        
+        for i in range(segments):
+            theta = i * 2 * math.pi / segments
+            x = radius_at_phi * math.cos(theta)  # No position offset
+            y = -length / 2 + y_offset  # Centered at origin
+            z = radius_at_phi * math.sin(theta)  # No position offset
+            vertices.extend([x, y, z])
+            
+            # Normal for hemisphere
+            nx = math.cos(phi) * math.cos(theta)
+            ny = math.sin(phi)
+            nz = math.cos(phi) * math.sin(theta)
+            normals.extend([nx, ny, nz])
+    
+    # Generate top hemisphere (using radius2)
+    for j in range(1, hemisphere_segments + 1):
+        phi = j * (math.pi / 2) / hemisphere_segments
+        y_offset = radius2 * math.sin(phi)
+        radius_at_phi = radius2 * math.cos(phi)
+        
+        for i in range(segments):
+            theta = i * 2 * math.pi / segments
+            x = radius_at_phi * math.cos(theta)  # No position offset
+            y = length / 2 + y_offset  # Centered at origin
+            z = radius_at_phi * math.sin(theta)  # No position offset
+            vertices.extend([x, y, z])
+            
+            # Normal for hemisphere
+            nx = math.cos(phi) * math.cos(theta)
+            ny = math.sin(phi)
+            nz = math.cos(phi) * math.sin(theta)
+            normals.extend([nx, ny, nz])
+    
+    # Add top cap center vertex
+    vertices.extend([0, length / 2, 0])
+    normals.extend([0, 1, 0])
+    top_center_idx = len(vertices) // 3 - 1
+    
+    # Generate indices for tapered cylinder body
+    for ring in range(cylinder_rings):
+        for i in range(segments):
+            next_i = (i + 1) % segments
+            
+            # Current ring indices
+            curr_ring_start = ring * segments
+            next_ring_start = (ring + 1) * segments
+            
+            curr_i = curr_ring_start + i
+            curr_next = curr_ring_start + next_i
+            next_i_idx = next_ring_start + i
+            next_next = next_ring_start + next_i
+            
+            # Two triangles per quad (fixed winding order for outward-facing normals)
+            indices.extend([curr_i, next_i_idx, curr_next])
+            indices.extend([curr_next, next_i_idx, next_next])
+    
+    # Generate indices for hemispheres
+    base_cylinder = (cylinder_rings + 1) * segments
+    bottom_center_idx = base_cylinder  # Index of bottom center vertex
+    bottom_hemisphere_start = bottom_center_idx + 1
+    
+    # Connect bottom center to first ring of bottom hemisphere
+    for i in range(segments):
+        next_i = (i + 1) % segments
+        indices.extend([bottom_center_idx, bottom_hemisphere_start + i, bottom_hemisphere_start + next_i])
+    
+    # Connect bottom hemisphere to cylinder bottom
+    cylinder_bottom_ring = 0  # First ring of cylinder
+    bottom_hemisphere_last_ring = bottom_hemisphere_start + (hemisphere_segments - 1) * segments
+    for i in range(segments):
+        next_i = (i + 1) % segments
+        indices.extend([
+            cylinder_bottom_ring + i, bottom_hemisphere_last_ring + i, cylinder_bottom_ring + next_i
+        ])
+        indices.extend([
+            cylinder_bottom_ring + next_i, bottom_hemisphere_last_ring + i, bottom_hemisphere_last_ring + next_i
+        ])
+    
+    # Bottom hemisphere internal rings
+    for j in range(hemisphere_segments - 1):
+        for i in range(segments):
+            next_i = (i + 1) % segments
+            
+            curr_ring = bottom_hemisphere_start + j * segments
+            next_ring = bottom_hemisphere_start + (j + 1) * segments
+            
+            indices.extend([
+                curr_ring + i, next_ring + i, curr_ring + next_i
+            ])
+            indices.extend([
+                curr_ring + next_i, next_ring + i, next_ring + next_i
+            ])
+    
+    # Top hemisphere indices
+    top_hemisphere_start = bottom_hemisphere_start + hemisphere_segments * segments
+    top_center_idx = top_hemisphere_start + hemisphere_segments * segments
+    
+    # Connect cylinder top to top hemisphere
+    cylinder_top_ring = cylinder_rings * segments  # Last ring of cylinder
+    top_hemisphere_first_ring = top_hemisphere_start
+    for i in range(segments):
+        next_i = (i + 1) % segments
+        indices.extend([
+            cylinder_top_ring + i, top_hemisphere_first_ring + i, top_hemisphere_first_ring + next_i
+        ])
+        indices.extend([
+            cylinder_top_ring + i, top_hemisphere_first_ring + next_i, cylinder_top_ring + next_i
+        ])
+    
+    # Top hemisphere internal rings
+    for j in range(hemisphere_segments - 1):
+        for i in range(segments):
+            next_i = (i + 1) % segments
+            
+            curr_ring = top_hemisphere_start + j * segments
+            next_ring = top_hemisphere_start + (j + 1) * segments
+            
+            indices.extend([
+                curr_ring + i, next_ring + i, curr_ring + next_i
+            ])
+            indices.extend([
+                curr_ring + next_i, next_ring + i, next_ring + next_i
+            ])
+    
+    # Connect top hemisphere last ring to top center
+    top_hemisphere_last_ring = top_hemisphere_start + (hemisphere_segments - 1) * segments
+    for i in range(segments):
+        next_i = (i + 1) % segments
+        indices.extend([top_hemisphere_last_ring + i, top_center_idx, top_hemisphere_last_ring + next_i])
+    
+    # Note: Rotation is now handled at the node level, not during mesh generation
+    # This allows for proper local transformations in the glTF structure
+    
+    return {
+        'vertices': vertices,
+        'normals': normals,
+        'indices': indices
+    }
+
+
+class GLBStreamWriter:
+    """Streams binary buffer data to disk while a GLB file is being built.
+
+    Each capsule's vertex/index bytes are appended to a temporary side file as
+    soon as they are generated, so peak memory stays at one capsule's worth of
+    geometry instead of the whole combined buffer. finalize() assembles the GLB
+    container (header + JSON chunk + binary chunk) around the streamed data.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._bin_path = path + ".bin.tmp"
+        self._bin_file = open(self._bin_path, 'wb')
+        self.byte_length = 0
+
+    def append(self, byte_data: bytes) -> int:
+        """Append raw bytes (4-byte aligned) and return their byte offset."""
+        padding = (-self.byte_length) % 4
+        if padding:
+            self._bin_file.write(b'\x00' * padding)
+            self.byte_length += padding
+        byte_offset = self.byte_length
+        self._bin_file.write(byte_data)
+        self.byte_length += len(byte_data)
+        return byte_offset
+
+    def finalize(self, json_header: Dict[str, Any]):
+        """Write the GLB container and splice in the streamed binary chunk."""
+        self._bin_file.close()
+        if ORJSON_AVAILABLE:
+            json_bytes = orjson.dumps(json_header)
+        else:
+            json_bytes = json.dumps(json_header, separators=(',', ':')).encode('utf-8')
+        json_bytes += b' ' * ((-len(json_bytes)) % 4)
+        bin_padding = (-self.byte_length) % 4
+        total_length = 12 + 8 + len(json_bytes) + 8 + self.byte_length + bin_padding
+
+        with open(self.path, 'wb') as f:
+            f.write(struct.pack('<4sII', b'glTF', 2, total_length))
+            f.write(struct.pack('<II', len(json_bytes), 0x4E4F534A))  # JSON chunk
+            f.write(json_bytes)
+            f.write(struct.pack('<II', self.byte_length + bin_padding, 0x004E4942))  # BIN chunk
+            # Stream the side file into place rather than reading it whole.
+            with open(self._bin_path, 'rb') as bin_file:
+                shutil.copyfileobj(bin_file, f)
+            if bin_padding:
+                f.write(b'\x00' * bin_padding)
+
+        os.remove(self._bin_path)
+
+
 class GLTFCapsuleGenerator:
     def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear document state so one instance can emit several GLTFs in a
+        row; the module-level unit-mesh cache keeps its entries across
+        resets, which is the point of reusing the instance."""
         self.gltf_data = {
             "asset": {
                 "version": "2.0",
@@ -41,210 +335,36 @@ class GLTFCapsuleGenerator:
             ]
         }
         self.buffer_data = bytearray()
+        self.glb_writer = None
         self.accessor_offset = 0
         self.buffer_view_offset = 0
         self.buffer_offset = 0
         self.node_offset = 0
         
-    def generate_capsule_mesh(self, length: float, radius1: float, radius2: float, 
+    def generate_capsule_mesh(self, length: float, radius1: float, radius2: float,
                             rotation_matrix: List[List[float]] = None,
                             segments: int = 16) -> Dict[str, Any]:
         """Generate mesh data for a tapered capsule centered at origin with NO rotation applied (pure geometry)."""
-        vertices = []
-        normals = []
-        indices = []
-        
-        # Generate tapered cylinder body with multiple rings for smooth tapering
-        cylinder_rings = 8  # Number of rings along the cylinder for smooth tapering
-        
-        for ring in range(cylinder_rings + 1):
-            # Interpolate position and radius along the cylinder
-            t = ring / cylinder_rings  # 0 to 1 from bottom to top
-            y_pos = -length / 2 + t * length  # Centered at origin
-            
-            # Linear interpolation between bottom and top radius
-            current_radius = radius1 + t * (radius2 - radius1)
-            
-            for i in range(segments):
-                theta = i * 2 * math.pi / segments
-                cos_theta = math.cos(theta)
-                sin_theta = math.sin(theta)
-                
-                x = current_radius * cos_theta  # No position offset
-                y = y_pos
-                z = current_radius * sin_theta  # No position offset
-                vertices.extend([x, y, z])
-                
-                # Calculate normal for tapered surface
-                # For tapered cylinder, normal needs to account for the slope
-                radius_diff = radius2 - radius1
-                slope_factor = radius_diff / length if length > 0 else 0
-                
-                # Normal vector accounting for taper
-                nx = cos_theta
-                ny = slope_factor  # Y component based on taper
-                nz = sin_theta
-                
-                # Normalize the normal vector
-                normal_length = math.sqrt(nx*nx + ny*ny + nz*nz)
-                if normal_length > 0:
-                    nx /= normal_length
-                    ny /= normal_length
-                    nz /= normal_length
-                
-                normals.extend([nx, ny, nz])
-        
-        # Generate bottom hemisphere (using radius1)
-        hemisphere_segments = segments // 2
-        
-        # Add bottom cap center vertex
-        vertices.extend([0, -length / 2, 0])
-        normals.extend([0, -1, 0])
-        bottom_center_idx = len(vertices) // 3 - 1
-        
-        for j in range(1, hemisphere_segments + 1):
-            phi = -math.pi / 2 + j * (math.pi / 2) / hemisphere_segments
-            y_offset = radius1 * math.sin(phi)
-            radius_at_phi = radius1 * math.cos(phi)
-            
-            for i in range(segments):
-                theta = i * 2 * math.pi / segments
-                x = radius_at_phi * math.cos(theta)  # No position offset
-                y = -length / 2 + y_offset  # Centered at origin
-                z = radius_at_phi * math.sin(theta)  # No position offset
-                vertices.extend([x, y, z])
-                
-                # Normal for hemisphere
-                nx = math.cos(phi) * math.cos(theta)
-                ny = math.sin(phi)
-                nz = math.cos(phi) * math.sin(theta)
-                normals.extend([nx, ny, nz])
-        
-        # Generate top hemisphere (using radius2)
-        for j in range(1, hemisphere_segments + 1):
-            phi = j * (math.pi / 2) / hemisphere_segments
-            y_offset = radius2 * math.sin(phi)
-            radius_at_phi = radius2 * math.cos(phi)
-            
-            for i in range(segments):
-                theta = i * 2 * math.pi / segments
-                x = radius_at_phi * math.cos(theta)  # No position offset
-                y = length / 2 + y_offset  # Centered at origin
-                z = radius_at_phi * math.sin(theta)  # No position offset
-                vertices.extend([x, y, z])
-                
-                # Normal for hemisphere
-                nx = math.cos(phi) * math.cos(theta)
-                ny = math.sin(phi)
-                nz = math.cos(phi) * math.sin(theta)
-                normals.extend([nx, ny, nz])
-        
-        # Add top cap center vertex
-        vertices.extend([0, length / 2, 0])
-        normals.extend([0, 1, 0])
-        top_center_idx = len(vertices) // 3 - 1
-        
-        # Generate indices for tapered cylinder body
-        for ring in range(cylinder_rings):
-            for i in range(segments):
-                next_i = (i + 1) % segments
-                
-                # Current ring indices
-                curr_ring_start = ring * segments
-                next_ring_start = (ring + 1) * segments
-                
-                curr_i = curr_ring_start + i
-                curr_next = curr_ring_start + next_i
-                next_i_idx = next_ring_start + i
-                next_next = next_ring_start + next_i
-                
-                # Two triangles per quad (fixed winding order for outward-facing normals)
-                indices.extend([curr_i, next_i_idx, curr_next])
-                indices.extend([curr_next, next_i_idx, next_next])
-        
-        # Generate indices for hemispheres
-        base_cylinder = (cylinder_rings + 1) * segments
-        bottom_center_idx = base_cylinder  # Index of bottom center vertex
-        bottom_hemisphere_start = bottom_center_idx + 1
-        
-        # Connect bottom center to first ring of bottom hemisphere
-        for i in range(segments):
-            next_i = (i + 1) % segments
-            indices.extend([bottom_center_idx, bottom_hemisphere_start + i, bottom_hemisphere_start + next_i])
-        
-        # Connect bottom hemisphere to cylinder bottom
-        cylinder_bottom_ring = 0  # First ring of cylinder
-        bottom_hemisphere_last_ring = bottom_hemisphere_start + (hemisphere_segments - 1) * segments
-        for i in range(segments):
-            next_i = (i + 1) % segments
-            indices.extend([
-                cylinder_bottom_ring + i, bottom_hemisphere_last_ring + i, cylinder_bottom_ring + next_i
-            ])
-            indices.extend([
-                cylinder_bottom_ring + next_i, bottom_hemisphere_last_ring + i, bottom_hemisphere_last_ring + next_i
-            ])
-        
-        # Bottom hemisphere internal rings
-        for j in range(hemisphere_segments - 1):
-            for i in range(segments):
-                next_i = (i + 1) % segments
-                
-                curr_ring = bottom_hemisphere_start + j * segments
-                next_ring = bottom_hemisphere_start + (j + 1) * segments
-                
-                indices.extend([
-                    curr_ring + i, next_ring + i, curr_ring + next_i
-                ])
-                indices.extend([
-                    curr_ring + next_i, next_ring + i, next_ring + next_i
-                ])
-        
-        # Top hemisphere indices
-        top_hemisphere_start = bottom_hemisphere_start + hemisphere_segments * segments
-        top_center_idx = top_hemisphere_start + hemisphere_segments * segments
-        
-        # Connect cylinder top to top hemisphere
-        cylinder_top_ring = cylinder_rings * segments  # Last ring of cylinder
-        top_hemisphere_first_ring = top_hemisphere_start
-        for i in range(segments):
-            next_i = (i + 1) % segments
-            indices.extend([
-                cylinder_top_ring + i, top_hemisphere_first_ring + i, top_hemisphere_first_ring + next_i
-            ])
-            indices.extend([
-                cylinder_top_ring + i, top_hemisphere_first_ring + next_i, cylinder_top_ring + next_i
-            ])
-        
-        # Top hemisphere internal rings
-        for j in range(hemisphere_segments - 1):
-            for i in range(segments):
-                next_i = (i + 1) % segments
-                
-                curr_ring = top_hemisphere_start + j * segments
-                next_ring = top_hemisphere_start + (j + 1) * segments
-                
-                indices.extend([
-                    curr_ring + i, next_ring + i, curr_ring + next_i
-                ])
-                indices.extend([
-                    curr_ring + next_i, next_ring + i, next_ring + next_i
-                ])
-        
-        # Connect top hemisphere last ring to top center
-        top_hemisphere_last_ring = top_hemisphere_start + (hemisphere_segments - 1) * segments
-        for i in range(segments):
-            next_i = (i + 1) % segments
-            indices.extend([top_hemisphere_last_ring + i, top_center_idx, top_hemisphere_last_ring + next_i])
-        
-        # Note: Rotation is now handled at the node level, not during mesh generation
-        # This allows for proper local transformations in the glTF structure
-        
-        return {
-            'vertices': vertices,
-            'normals': normals,
-            'indices': indices
-        }
-    
+        if length > 0:
+            # Quantize the radius ratios so similar capsules share a cached unit
+            # mesh; the uniform length scale is applied in one broadcast op.
+            r1_ratio = round(radius1 / length, 3)
+            r2_ratio = round(radius2 / length, 3)
+            unit_vertices, normals, indices = _unit_capsule_mesh(r1_ratio, r2_ratio, segments)
+            return {
+                'vertices': (unit_vertices * length).tolist(),
+                'normals': normals,
+                'indices': indices
+            }
+        return _build_capsule_mesh(length, radius1, radius2, segments)
+
+
+
+    def begin_glb(self, output_path: str) -> GLBStreamWriter:
+        """Start streaming buffer data to a GLB file instead of building it in memory."""
+        self.glb_writer = GLBStreamWriter(output_path)
+        return self.glb_writer
+
     def add_buffer_data(self, data: List[float], component_type: int = 5126) -> int:
         """Add data to buffer and return accessor index."""
         # Convert to bytes
@@ -256,13 +376,17 @@ class GLTFCapsuleGenerator:
             byte_data = struct.pack(f'{len(data)}I', *data)
         else:
             raise ValueError(f"Unsupported component type: {component_type}")
-        
-        # Align to 4-byte boundary
-        while len(self.buffer_data) % 4 != 0:
-            self.buffer_data.append(0)
-        
-        byte_offset = len(self.buffer_data)
-        self.buffer_data.extend(byte_data)
+
+        if self.glb_writer is not None:
+            # Streaming mode: bytes go straight to disk, only offsets are kept.
+            byte_offset = self.glb_writer.append(byte_data)
+        else:
+            # Align to 4-byte boundary
+            while len(self.buffer_data) % 4 != 0:
+                self.buffer_data.append(0)
+
+            byte_offset = len(self.buffer_data)
+            self.buffer_data.extend(byte_data)
         
         # Create buffer view
         buffer_view_index = len(self.gltf_data["bufferViews"])
@@ -306,10 +430,11 @@ class GLTFCapsuleGenerator:
         normals = capsule_data['normals']
         indices = capsule_data['indices']
         
-        # Calculate bounding box
-        vertex_count = len(vertices) // 3
-        min_pos = [min(vertices[i::3]) for i in range(3)]
-        max_pos = [max(vertices[i::3]) for i in range(3)]
+        # Calculate bounding box in one vectorized pass
+        vertex_array = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+        vertex_count = len(vertex_array)
+        min_pos = vertex_array.min(axis=0).tolist()
+        max_pos = vertex_array.max(axis=0).tolist()
         
         # Add vertex data to buffer
         vertex_buffer_view = self.add_buffer_data(vertices, 5126)  # FLOAT
@@ -420,36 +545,121 @@ class GLTFCapsuleGenerator:
         
         return node_index
     
+    def add_combined_mesh(self, vertices: np.ndarray, normals: np.ndarray,
+                          indices: np.ndarray,
+                          joints: np.ndarray = None,
+                          weights: np.ndarray = None,
+                          vertex_colors: np.ndarray = None) -> int:
+        """Add all capsules as one mesh with a single primitive.
+
+        Expects world-space vertex/normal arrays concatenated across capsules
+        with offset-adjusted indices; per-bone information is carried by the
+        JOINTS_0 attribute instead of separate nodes. One primitive means one
+        draw call downstream and a much smaller JSON section.
+        Returns the node index of the combined mesh.
+        """
+        vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+        normals = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+        indices = np.asarray(indices, dtype=np.uint32).ravel()
+        vertex_count = len(vertices)
+
+        vertex_buffer_view = self.add_buffer_data(vertices.ravel().tolist(), 5126)
+        vertex_accessor = self.create_accessor(
+            vertex_buffer_view, vertex_count, "VEC3", 5126,
+            vertices.min(axis=0).tolist(), vertices.max(axis=0).tolist()
+        )
+
+        normal_buffer_view = self.add_buffer_data(normals.ravel().tolist(), 5126)
+        normal_accessor = self.create_accessor(normal_buffer_view, vertex_count, "VEC3", 5126)
+
+        index_buffer_view = self.add_buffer_data(indices.tolist(), 5125)
+        index_accessor = self.create_accessor(index_buffer_view, len(indices), "SCALAR", 5125)
+
+        attributes = {
+            "POSITION": vertex_accessor,
+            "NORMAL": normal_accessor
+        }
+
+        if joints is not None and weights is not None:
+            joints_flat = np.asarray(joints, dtype=np.uint16).ravel()
+            joints_buffer_view = self.add_buffer_data(joints_flat.tolist(), 5123)
+            attributes["JOINTS_0"] = self.create_accessor(
+                joints_buffer_view, vertex_count, "VEC4", 5123
+            )
+
+            weights_flat = np.asarray(weights, dtype=np.float32).ravel()
+            weights_buffer_view = self.add_buffer_data(weights_flat.tolist(), 5126)
+            attributes["WEIGHTS_0"] = self.create_accessor(
+                weights_buffer_view, vertex_count, "VEC4", 5126
+            )
+
+        if vertex_colors is not None:
+            colors_flat = np.asarray(vertex_colors, dtype=np.float32).ravel()
+            colors_buffer_view = self.add_buffer_data(colors_flat.tolist(), 5126)
+            attributes["COLOR_0"] = self.create_accessor(
+                colors_buffer_view, vertex_count, "VEC3", 5126
+            )
+
+        mesh_index = len(self.gltf_data["meshes"])
+        self.gltf_data["meshes"].append({
+            "name": "CombinedCapsules",
+            "primitives": [{
+                "attributes": attributes,
+                "indices": index_accessor,
+                "material": 0
+            }]
+        })
+
+        node_index = len(self.gltf_data["nodes"])
+        self.gltf_data["nodes"].append({
+            "name": "CombinedCapsules",
+            "mesh": mesh_index
+        })
+
+        print(f"Added combined mesh: {vertex_count} vertices, {len(indices) // 3} triangles in 1 primitive")
+        return node_index
+
+    def finalize_gltf(self, scene_nodes: List[int]) -> Dict[str, Any]:
+        """Finalize buffers and the scene for meshes already added to the scene."""
+        self.gltf_data["scenes"][0]["nodes"] = scene_nodes
+        self._finalize_buffer()
+
+        if not self.validate_gltf_structure():
+            print("WARNING: GLTF validation failed - the file may not import correctly")
+
+        return self.gltf_data
+
     def load_vrm_model(self, vrm_path: str) -> Dict[str, Any]:
         """Load existing VRM model to extract skeleton information."""
         try:
+            # Memory-map the file so only the pages actually touched get
+            # read: for a GLB that is just the header and the JSON chunk,
+            # never the binary chunk where textures dominate.
             with open(vrm_path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
                 # Check if it's binary glTF (.glb) or JSON (.gltf)
-                magic = f.read(4)
-                f.seek(0)
-                
-                if magic == b'glTF':
+                if mm[:4] == b'glTF':
                     # Binary glTF format
-                    return self.load_glb(f)
+                    return self.load_glb(mm)
                 else:
                     # JSON glTF format
-                    return json.load(f)
+                    return _json_loads(mm[:])
+            finally:
+                mm.close()
         except Exception as e:
             print(f"Warning: Could not load VRM model {vrm_path}: {e}")
             return {}
-    
-    def load_glb(self, file) -> Dict[str, Any]:
-        """Load binary glTF (.glb) file."""
-        # Read header
-        magic = struct.unpack('4s', file.read(4))[0]
-        version = struct.unpack('I', file.read(4))[0]
-        length = struct.unpack('I', file.read(4))[0]
-        
-        # Read JSON chunk
-        json_chunk_length = struct.unpack('I', file.read(4))[0]
-        json_chunk_type = struct.unpack('4s', file.read(4))[0]
-        json_data = json.loads(file.read(json_chunk_length).decode('utf-8'))
-        
+
+    def load_glb(self, data) -> Dict[str, Any]:
+        """Extract the JSON chunk from binary glTF (.glb) bytes."""
+        # Header: magic, version, total length
+        magic, version, length = struct.unpack_from('<4sII', data, 0)
+
+        # First chunk is the JSON chunk
+        json_chunk_length, json_chunk_type = struct.unpack_from('<II', data, 12)
+        json_data = _json_loads(data[20:20 + json_chunk_length])
+
         return json_data
     
     def parse_dzn_file(self, dzn_path: str) -> Dict[str, Any]:
@@ -518,14 +728,9 @@ class GLTFCapsuleGenerator:
             return {}
     
     def apply_rotation_to_vector(self, vector: List[float], rotation_matrix: List[List[float]]) -> List[float]:
-        """Apply 3x3 rotation matrix to a 3D vector."""
-        x, y, z = vector
-        result = [
-            rotation_matrix[0][0] * x + rotation_matrix[0][1] * y + rotation_matrix[0][2] * z,
-            rotation_matrix[1][0] * x + rotation_matrix[1][1] * y + rotation_matrix[1][2] * z,
-            rotation_matrix[2][0] * x + rotation_matrix[2][1] * y + rotation_matrix[2][2] * z
-        ]
-        return result
+        """Apply 3x3 rotation matrix to a 3D vector (or an Nx3 batch of vectors)."""
+        rotation = np.asarray(rotation_matrix, dtype=np.float32)
+        return (np.asarray(vector, dtype=np.float32) @ rotation.T).tolist()
     
     def calculate_swing_rotation(self, from_vector: List[float], to_vector: List[float]) -> List[List[float]]:
         """Calculate rotation matrix to align from_vector with to_vector (swing rotation)."""
@@ -602,12 +807,7 @@ class GLTFCapsuleGenerator:
     
     def multiply_matrices(self, a: List[List[float]], b: List[List[float]]) -> List[List[float]]:
         """Multiply two 3x3 matrices."""
-        result = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
-        for i in range(3):
-            for j in range(3):
-                for k in range(3):
-                    result[i][j] += a[i][k] * b[k][j]
-        return result
+        return (np.asarray(a) @ np.asarray(b)).tolist()
     
     def matrix_to_quaternion(self, matrix: List[List[float]]) -> List[float]:
         """Convert 3x3 rotation matrix to quaternion [x, y, z, w]."""
@@ -648,9 +848,15 @@ class GLTFCapsuleGenerator:
         
         return [x, y, z, w]
     
-    def parse_minizinc_output(self, output_text: str, manual_scale: float = None, dzn_path: str = None) -> List[Dict[str, Any]]:
-        """Parse MiniZinc solver output to extract capsule parameters."""
+    def parse_minizinc_output(self, output_text, manual_scale: float = None, dzn_path: str = None) -> List[Dict[str, Any]]:
+        """Parse MiniZinc solver output to extract capsule parameters.
+
+        Accepts a str, bytes, or mmap object; bytes-like input is decoded
+        line-by-line so large solver output is never duplicated into one big
+        Python string.
+        """
         capsules = []
+        is_bytes = not isinstance(output_text, str)
         
         # Parse bone rotation and direction data from DZN file if provided
         bone_data = {}
@@ -667,12 +873,21 @@ class GLTFCapsuleGenerator:
             print(f"Using manual scale factor: {scale_factor}")
         else:
             # Auto-detect scaling from output
-            is_scaled = "Integer scaling: 1000x" in output_text
+            marker = b"Integer scaling: 1000x" if is_bytes else "Integer scaling: 1000x"
+            is_scaled = output_text.find(marker) != -1
             scale_factor = 1.0  # Always use 1.0 for float values
             if is_scaled:
                 print(f"Ignoring auto-detected scale factor, using 1.0 for float values")
-        
-        lines = output_text.strip().split('\n')
+
+        if is_bytes:
+            if hasattr(output_text, 'readline'):
+                output_text.seek(0)
+                raw_lines = iter(output_text.readline, b'')
+            else:
+                raw_lines = output_text.splitlines()
+            lines = (raw.decode('utf-8', 'replace') for raw in raw_lines)
+        else:
+            lines = output_text.strip().split('\n')
         for line in lines:
             if line.startswith('Capsule'):
                 # Parse new format: Capsule 1: pos(-84,792,-5) len(422) radii(164,164) bone(...) rot_swing(...) dir(...)
@@ -734,7 +949,7 @@ class GLTFCapsuleGenerator:
                         'length': length,
                         'radius1': r1,
                         'radius2': r2,
-                        'bone_name': bone_name,
+                        'bone_name': bone_name or f"Bone_{len(capsules)}",
                         'rotation_matrix': rotation_matrix,
                         'bone_direction': bone_direction
                     })
@@ -783,7 +998,7 @@ class GLTFCapsuleGenerator:
                             'length': length,
                             'radius1': r1,
                             'radius2': r2,
-                            'bone_name': bone_name,
+                            'bone_name': bone_name or f"Bone_{len(capsules)}",
                             'rotation_matrix': rotation_matrix,
                             'bone_direction': bone_direction
                         })
@@ -1030,18 +1245,8 @@ class GLTFCapsuleGenerator:
         
         print(f"Created flat structure with {len(capsule_node_indices)} capsules as direct children of root")
         
-        # Finalize buffer - ensure we have valid buffer data
-        if self.buffer_data:
-            # Encode buffer as base64 for embedded glTF
-            buffer_base64 = base64.b64encode(self.buffer_data).decode('ascii')
-            self.gltf_data["buffers"].append({
-                "byteLength": len(self.buffer_data),
-                "uri": f"data:application/octet-stream;base64,{buffer_base64}"
-            })
-            print(f"Created buffer with {len(self.buffer_data)} bytes")
-        else:
-            print("WARNING: No buffer data generated - this may cause import errors")
-        
+        self._finalize_buffer()
+
         # Validate GLTF structure before returning
         if not self.validate_gltf_structure():
             print("WARNING: GLTF validation failed - the file may not import correctly")
@@ -1051,20 +1256,84 @@ class GLTFCapsuleGenerator:
         
         return self.gltf_data
     
+    def _finalize_buffer(self):
+        """Record the buffer entry - ensure we have valid buffer data."""
+        if self.glb_writer is not None:
+            # Streaming GLB mode: the binary chunk is already on disk, the
+            # buffer entry just records its length (GLB buffers have no uri).
+            self.gltf_data["buffers"].append({
+                "byteLength": self.glb_writer.byte_length
+            })
+            print(f"Streamed buffer with {self.glb_writer.byte_length} bytes")
+        elif self.buffer_data:
+            # Encode buffer as base64 for embedded glTF
+            buffer_base64 = base64.b64encode(self.buffer_data).decode('ascii')
+            self.gltf_data["buffers"].append({
+                "byteLength": len(self.buffer_data),
+                "uri": f"data:application/octet-stream;base64,{buffer_base64}"
+            })
+            print(f"Created buffer with {len(self.buffer_data)} bytes")
+        else:
+            print("WARNING: No buffer data generated - this may cause import errors")
+
     def save_gltf(self, output_path: str):
-        """Save glTF to file."""
+        """Save glTF to file (finalizes the GLB container in streaming mode)."""
+        if self.glb_writer is not None:
+            self.glb_writer.finalize(self.gltf_data)
+            self.glb_writer = None
+            return
+        if ORJSON_AVAILABLE:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(self.gltf_data, option=orjson.OPT_INDENT_2))
+            return
         with open(output_path, 'w') as f:
             json.dump(self.gltf_data, f, indent=2)
 
+def compress_gltf(gltf_path: str) -> str:
+    """Quantize and compress a glTF file with gltfpack (meshopt compression).
+
+    Capsules are small meshes in a bounded volume, which is ideal for
+    fixed-range vertex quantization (fp32 positions -> int16, fp32 normals ->
+    int8), cutting on-disk and GPU vertex size roughly 4x. gltfpack is an
+    optional external tool; if it is not on PATH the uncompressed file is kept.
+    """
+    import subprocess
+
+    if shutil.which('gltfpack') is None:
+        print("Warning: gltfpack not found in PATH, skipping compression")
+        return gltf_path
+
+    base, _ = os.path.splitext(gltf_path)
+    packed_path = f"{base}_qc.glb"
+    try:
+        # stderr is only shown on failure, so skip the decode on success
+        result = subprocess.run(
+            ['gltfpack', '-i', gltf_path, '-o', packed_path, '-cc'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        if result.returncode != 0:
+            print(f"Warning: gltfpack failed ({result.stderr.decode(errors='replace').strip()}), "
+                  f"keeping uncompressed output")
+            return gltf_path
+    except OSError as e:
+        print(f"Warning: could not run gltfpack: {e}")
+        return gltf_path
+
+    print(f"Compressed glTF: {packed_path}")
+    return packed_path
+
+
 def main():
     import argparse
-    
+
     parser = argparse.ArgumentParser(description='Convert MiniZinc tapered capsule optimization output to glTF format')
     parser.add_argument('input_file', help='MiniZinc solver output with capsule parameters')
     parser.add_argument('output_file', help='Output glTF file with optimized capsules')
     parser.add_argument('vrm_file', nargs='?', help='Optional input VRM model to preserve extensions')
     parser.add_argument('--scale', type=float, help='Manual scale factor to divide coordinates by (overrides auto-detection)')
-    
+    parser.add_argument('--compress', action='store_true',
+                       help='Quantize/compress the output with gltfpack (requires gltfpack in PATH)')
+
     args = parser.parse_args()
     
     input_file = args.input_file
@@ -1111,6 +1380,10 @@ def main():
         # Save to file
         generator.save_gltf(output_file)
         print(f"Generated glTF file: {output_file}")
+
+        # Optional meshopt quantization/compression post-step
+        if args.compress:
+            compress_gltf(output_file)
         
         # Print stats
         total_vertices = sum(gltf_data["accessors"][mesh["primitives"][0]["attributes"]["POSITION"]]["count"] 
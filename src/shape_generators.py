@@ -5,6 +5,7 @@ Generates various geometric shapes for testing the pipeline.
 """
 
 import numpy as np
+from functools import lru_cache
 from typing import Tuple, List, Dict, Any
 
 class ShapeGenerator:
@@ -28,7 +29,7 @@ class ShapeGenerator:
             [cx + width/2, cy + height/2, cz - depth/2],  # 5
             [cx + width/2, cy + height/2, cz + depth/2],  # 6
             [cx - width/2, cy + height/2, cz + depth/2],  # 7
-        ])
+        ], dtype=np.float32)
         
         # Define faces (triangles) - each face is split into 2 triangles
         faces = np.array([
@@ -44,7 +45,7 @@ class ShapeGenerator:
             [0, 3, 7], [0, 7, 4],
             # Right face
             [1, 5, 6], [1, 6, 2]
-        ])
+        ], dtype=np.uint32)
         
         return {
             'vertices': vertices,
@@ -58,7 +59,11 @@ class ShapeGenerator:
         """Generate a cube with specified size."""
         return ShapeGenerator.generate_cuboid(size, size, size, center)
     
+    # The trig-heavy generators below are deterministic in their (hashable)
+    # parameters and the tests regenerate the same meshes repeatedly, so
+    # memoize them; callers must not mutate the returned arrays in place
     @staticmethod
+    @lru_cache(maxsize=32)
     def generate_cylinder(radius: float, height: float, 
                          center: Tuple[float, float, float] = (0, 0, 0),
                          segments: int = 32) -> Dict[str, Any]:
@@ -110,8 +115,11 @@ class ShapeGenerator:
             faces.append([2 + 2*i, 2 + 2*i + 1, 2 + 2*next_i])
             faces.append([2 + 2*next_i, 2 + 2*i + 1, 2 + 2*next_i + 1])
         
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        # Contiguous float32/uint32 is what the CoACD binding (and the
+        # test call sites) want, so convert once here instead of every
+        # consumer re-copying the arrays
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(faces, dtype=np.uint32)
         
         return {
             'vertices': vertices,
@@ -121,6 +129,7 @@ class ShapeGenerator:
         }
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def generate_cone(base_radius: float, height: float,
                      center: Tuple[float, float, float] = (0, 0, 0),
                      segments: int = 32) -> Dict[str, Any]:
@@ -159,8 +168,8 @@ class ShapeGenerator:
             next_i = (i + 1) % segments
             faces.append([apex_idx, 2 + i, 2 + next_i])
         
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(faces, dtype=np.uint32)
         
         return {
             'vertices': vertices,
@@ -170,6 +179,7 @@ class ShapeGenerator:
         }
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def generate_ellipsoid(a: float, b: float, c: float,
                           center: Tuple[float, float, float] = (0, 0, 0),
                           segments: int = 16) -> Dict[str, Any]:
@@ -204,8 +214,8 @@ class ShapeGenerator:
                 faces.append([i1, i3, i2])
                 faces.append([i2, i3, i4])
         
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(faces, dtype=np.uint32)
         
         return {
             'vertices': vertices,
@@ -215,12 +225,14 @@ class ShapeGenerator:
         }
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def generate_sphere(radius: float, center: Tuple[float, float, float] = (0, 0, 0),
                        segments: int = 16) -> Dict[str, Any]:
         """Generate a sphere with specified radius."""
         return ShapeGenerator.generate_ellipsoid(radius, radius, radius, center, segments)
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def generate_markoid(a: float, b: float, c: float, power: float = 2.0,
                         center: Tuple[float, float, float] = (0, 0, 0),
                         segments: int = 16) -> Dict[str, Any]:
@@ -270,8 +282,8 @@ class ShapeGenerator:
                 faces.append([i1, i3, i2])
                 faces.append([i2, i3, i4])
         
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(faces, dtype=np.uint32)
         
         return {
             'vertices': vertices,
@@ -315,8 +327,8 @@ class ShapeGenerator:
         faces.append([2, 5, 3])
         faces.append([2, 3, 0])
         
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(faces, dtype=np.uint32)
         
         return {
             'vertices': vertices,
@@ -353,8 +365,8 @@ class ShapeGenerator:
         faces.append([2, 3, 4])
         faces.append([3, 0, 4])
         
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(faces, dtype=np.uint32)
         
         return {
             'vertices': vertices,
@@ -364,6 +376,7 @@ class ShapeGenerator:
         }
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def generate_torus(major_radius: float, minor_radius: float,
                       center: Tuple[float, float, float] = (0, 0, 0),
                       major_segments: int = 32, minor_segments: int = 16) -> Dict[str, Any]:
@@ -405,8 +418,8 @@ class ShapeGenerator:
                 faces.append([i1, i3, i2])
                 faces.append([i2, i3, i4])
         
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(faces, dtype=np.uint32)
         
         bounds_size = major_radius + minor_radius
         return {
@@ -417,6 +430,7 @@ class ShapeGenerator:
         }
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def generate_biscuit(radius: float, thickness: float,
                         center: Tuple[float, float, float] = (0, 0, 0),
                         segments: int = 32) -> Dict[str, Any]:
@@ -462,8 +476,8 @@ class ShapeGenerator:
             faces.append([2*i, 2*i + 1, 2*next_i])
             faces.append([2*next_i, 2*i + 1, 2*next_i + 1])
         
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(faces, dtype=np.uint32)
         
         return {
             'vertices': vertices,
@@ -477,6 +491,15 @@ class ShapeGenerator:
                              radius: float = 0.1,
                              segments: int = 8) -> Dict[str, Any]:
         """Generate a cubic stroke (spline line) following a series of control points."""
+        # Control points arrive as lists; hash them as a tuple of tuples so
+        # repeated strokes hit the cache on the worker below
+        return ShapeGenerator._cubic_stroke_cached(tuple(map(tuple, points)), radius, segments)
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _cubic_stroke_cached(points: Tuple[Tuple[float, float, float], ...],
+                            radius: float,
+                            segments: int) -> Dict[str, Any]:
         if len(points) < 2:
             raise ValueError("Need at least 2 points to create a stroke")
         
@@ -532,8 +555,8 @@ class ShapeGenerator:
                              segment_vertices_start + 2*next_j, 
                              segment_vertices_start + 2*next_j + 1])
         
-        vertices = np.array(vertices)
-        faces = np.array(faces)
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(faces, dtype=np.uint32)
         
         # Calculate bounds
         if len(vertices) > 0:
@@ -7,25 +7,24 @@ Complete pipeline from VRM analysis to skinned capsule glTF generation.
 import sys
 import os
 import json
+import mmap
 import numpy as np
 from typing import Dict, Any, List, Tuple, Optional
 import argparse
 
-# Import our modules
-from .vrm_mesh_analyzer import VRMMeshAnalyzer
-from .minizinc_to_gltf import GLTFCapsuleGenerator
-from .capsule_skinning import CapsuleSkinningSystem
-
 class SkinnedCapsulePipeline:
     """
     Complete pipeline for generating skinned capsule representations from VRM models.
     """
-    
+
     def __init__(self):
-        self.analyzer = VRMMeshAnalyzer()
-        self.generator = GLTFCapsuleGenerator()
-        self.skinning = CapsuleSkinningSystem()
-        
+        # Heavy collaborators (VRM analysis, scipy-backed skinning) are
+        # constructed lazily so --help and argument-validation error paths
+        # don't pay their import cost.
+        self._analyzer = None
+        self._generator = None
+        self._skinning = None
+
         # Pipeline configuration
         self.config = {
             "max_capsules": 25,
@@ -34,9 +33,31 @@ class SkinnedCapsulePipeline:
             "vertex_color_mode": "bone_visualization",
             "enable_skinning": True,
             "enable_vertex_colors": True,
+            "combine_meshes": False,  # Merge all capsules into one primitive
             "segments": 16  # Capsule mesh resolution
         }
-    
+
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            from .vrm_mesh_analyzer import VRMMeshAnalyzer
+            self._analyzer = VRMMeshAnalyzer()
+        return self._analyzer
+
+    @property
+    def generator(self):
+        if self._generator is None:
+            from .minizinc_to_gltf import GLTFCapsuleGenerator
+            self._generator = GLTFCapsuleGenerator()
+        return self._generator
+
+    @property
+    def skinning(self):
+        if self._skinning is None:
+            from .capsule_skinning import CapsuleSkinningSystem
+            self._skinning = CapsuleSkinningSystem()
+        return self._skinning
+
     def load_vrm_and_analyze(self, vrm_path: str) -> bool:
         """Load VRM file and perform mesh analysis."""
         print(f"=== Loading and Analyzing VRM: {vrm_path} ===")
@@ -70,14 +91,18 @@ class SkinnedCapsulePipeline:
         print(f"\n=== Parsing Optimization Results ===")
         
         try:
-            with open(results_path, 'r') as f:
-                results_content = f.read()
-            
-            capsules = self.generator.parse_minizinc_output(
-                results_content, 
-                manual_scale=self.config["scale_factor"],
-                dzn_path=dzn_path
-            )
+            # mmap the solver output so parsing runs zero-copy against the
+            # kernel page cache instead of duplicating the file into a string.
+            with open(results_path, 'rb') as f:
+                if os.path.getsize(results_path) > 0:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        capsules = self.generator.parse_minizinc_output(
+                            mm,
+                            manual_scale=self.config["scale_factor"],
+                            dzn_path=dzn_path
+                        )
+                else:
+                    capsules = []
             
             print(f"✅ Parsed {len(capsules)} capsules from results")
             return capsules
@@ -99,6 +124,11 @@ class SkinnedCapsulePipeline:
             return False
         
         try:
+            # Stream binary data straight to disk for GLB output so peak
+            # memory stays at one capsule's worth of geometry.
+            if output_path.endswith('.glb'):
+                self.generator.begin_glb(output_path)
+
             # Load VRM data for extensions if provided
             vrm_data = {}
             if vrm_path:
@@ -137,11 +167,13 @@ class SkinnedCapsulePipeline:
                     self.analyzer.triangles[i + 2]
                 ])
         
+        # Hand downstream consumers the glTF-native dtypes up front so no
+        # intermediate pass widens them to float64
         return {
-            'vertices': self.analyzer.vertices,
-            'faces': faces,
-            'bone_weights': self.analyzer.bone_weights,
-            'bone_indices': self.analyzer.bone_indices,
+            'vertices': np.asarray(self.analyzer.vertices, dtype=np.float32),
+            'faces': np.asarray(faces, dtype=np.int32),
+            'bone_weights': np.asarray(self.analyzer.bone_weights, dtype=np.float32),
+            'bone_indices': np.asarray(self.analyzer.bone_indices, dtype=np.int32),
             'joint_names': self.analyzer.joint_names
         }
     
@@ -159,8 +191,8 @@ class SkinnedCapsulePipeline:
             length = capsule['length']
             r1 = capsule['radius1']
             r2 = capsule['radius2']
-            rotation_matrix = capsule.get('rotation_matrix')
-            bone_name = capsule.get('bone_name', f"Bone_{i}")
+            rotation_matrix = capsule['rotation_matrix']
+            bone_name = capsule['bone_name']
             
             # Generate capsule mesh
             capsule_mesh = self.generator.generate_capsule_mesh(
@@ -183,6 +215,34 @@ class SkinnedCapsulePipeline:
         print(f"✅ Generated basic capsule glTF: {output_path}")
         return True
     
+    def _validate_capsules(self, capsules: List[Dict[str, Any]]) -> np.ndarray:
+        """Vectorized pre-validation of capsule parameters.
+
+        Returns a boolean mask of capsules that are well-formed (positive
+        length and radii, finite position/rotation), so the skinning loop can
+        assume good inputs instead of wrapping every iteration in try/except.
+        """
+        n = len(capsules)
+        lengths = np.array([c.get('length', 0.0) for c in capsules], dtype=np.float64)
+        radii1 = np.array([c.get('radius1', 0.0) for c in capsules], dtype=np.float64)
+        radii2 = np.array([c.get('radius2', 0.0) for c in capsules], dtype=np.float64)
+        positions = np.array([c.get('position', (0.0, 0.0, 0.0)) for c in capsules], dtype=np.float64)
+
+        mask = (
+            (lengths > 1e-9) & np.isfinite(lengths) &
+            (radii1 > 0) & np.isfinite(radii1) &
+            (radii2 > 0) & np.isfinite(radii2) &
+            np.isfinite(positions).all(axis=1)
+        )
+
+        # Rotation matrices are optional; when present they must be finite
+        for i in range(n):
+            rotation = capsules[i].get('rotation_matrix')
+            if rotation is not None and not np.isfinite(np.asarray(rotation, dtype=np.float64)).all():
+                mask[i] = False
+
+        return mask
+
     def _generate_skinned_capsules_with_weights(self,
                                               capsules: List[Dict[str, Any]], 
                                               output_path: str,
@@ -191,89 +251,157 @@ class SkinnedCapsulePipeline:
                                               dzn_path: str = None) -> bool:
         """Generate capsules with full skinning and vertex color support."""
         print("Generating skinned capsules with weight transfer and vertex colors...")
-        
+
+        # Flag malformed capsules up front so the skinning loop can assume
+        # well-formed inputs; bad entries still get basic (unskinned) geometry.
+        valid_mask = self._validate_capsules(capsules)
+        n_invalid = len(capsules) - int(np.sum(valid_mask))
+        if n_invalid:
+            print(f"⚠️  {n_invalid} capsule(s) failed validation, generating them without skinning")
+
+        # Bind config and collaborators to locals once instead of paying
+        # dict/attribute lookups on every capsule iteration
+        segments = self.config["segments"]
+        smoothing_iterations = self.config["smoothing_iterations"]
+        enable_skinning = self.config["enable_skinning"]
+        enable_vertex_colors = self.config["enable_vertex_colors"]
+        vertex_color_mode = self.config["vertex_color_mode"]
+        joint_names = original_mesh_data.get('joint_names')
+        combine_meshes = self.config["combine_meshes"]
+        generator = self.generator
+        skinning = self.skinning
+
+        # Per-capsule accumulators for single-primitive output
+        all_vertices = []
+        all_normals = []
+        all_indices = []
+        all_joints = []
+        all_weights = []
+        all_colors = []
+        vertex_offset = 0
+        total_vertices = 0
+
         # Generate capsule meshes with skinning
         for i, capsule in enumerate(capsules):
             position = capsule['position']
             length = capsule['length']
             r1 = capsule['radius1']
             r2 = capsule['radius2']
-            rotation_matrix = capsule.get('rotation_matrix')
-            bone_name = capsule.get('bone_name', f"Bone_{i}")
-            
+            # parse_minizinc_output guarantees these keys, so no per-iteration
+            # .get() default construction is needed
+            rotation_matrix = capsule['rotation_matrix']
+            bone_name = capsule['bone_name']
+
             print(f"\nProcessing capsule {i+1}/{len(capsules)}: {bone_name}")
-            
+
             # Generate capsule mesh
-            capsule_mesh = self.generator.generate_capsule_mesh(
-                length, r1, r2, segments=self.config["segments"]
+            capsule_mesh = generator.generate_capsule_mesh(
+                length, r1, r2, segments=segments
             )
-            
-            # Convert mesh data to numpy arrays
-            capsule_vertices = np.array(capsule_mesh['vertices']).reshape(-1, 3)
-            capsule_faces = np.array(capsule_mesh['indices']).reshape(-1, 3)
-            
+
             skinning_data = None
             vertex_colors = None
-            
-            # Generate skinning data if enabled
-            if self.config["enable_skinning"]:
-                try:
-                    # Transfer and smooth weights
-                    smooth_weights, bone_indices = self.skinning.transfer_and_smooth_capsule_weights(
-                        capsule_vertices,
-                        capsule_faces,
-                        original_mesh_data,
-                        smoothing_iterations=self.config["smoothing_iterations"]
-                    )
-                    
-                    # Prepare skinning data for glTF
-                    joints_data, weights_data = self.skinning.prepare_skinning_data(
-                        smooth_weights, bone_indices
+            total_vertices += len(capsule_mesh['vertices']) // 3
+
+            # Generate skinning data if enabled and the capsule is well-formed
+            if enable_skinning and valid_mask[i]:
+                # Convert mesh data to numpy arrays
+                capsule_vertices = np.array(capsule_mesh['vertices'], dtype=np.float32).reshape(-1, 3)
+                capsule_faces = np.array(capsule_mesh['indices'], dtype=np.int32).reshape(-1, 3)
+
+                # Transfer and smooth weights
+                smooth_weights, bone_indices = skinning.transfer_and_smooth_capsule_weights(
+                    capsule_vertices,
+                    capsule_faces,
+                    original_mesh_data,
+                    smoothing_iterations=smoothing_iterations
+                )
+
+                # Prepare skinning data for glTF
+                joints_data, weights_data = skinning.prepare_skinning_data(
+                    smooth_weights, bone_indices
+                )
+
+                skinning_data = {
+                    "joints": joints_data,
+                    "weights": weights_data
+                }
+
+                print(f"  ✅ Generated skinning data: {len(joints_data)} vertices")
+
+                # Generate vertex colors if enabled
+                if enable_vertex_colors:
+                    vertex_colors = skinning.generate_vertex_colors(
+                        smooth_weights,
+                        bone_indices,
+                        mode=vertex_color_mode,
+                        bone_names=joint_names
                     )
-                    
-                    skinning_data = {
-                        "joints": joints_data,
-                        "weights": weights_data
-                    }
-                    
-                    print(f"  ✅ Generated skinning data: {len(joints_data)} vertices")
-                    
-                    # Generate vertex colors if enabled
-                    if self.config["enable_vertex_colors"]:
-                        vertex_colors = self.skinning.generate_vertex_colors(
-                            smooth_weights, 
-                            bone_indices, 
-                            mode=self.config["vertex_color_mode"],
-                            bone_names=original_mesh_data.get('joint_names')
-                        )
-                        print(f"  ✅ Generated vertex colors: {self.config['vertex_color_mode']} mode")
-                    
-                except Exception as e:
-                    print(f"  ⚠️  Skinning failed for capsule {i+1}: {e}")
-                    print("  Falling back to basic capsule generation")
-            
-            # Add capsule to scene
-            self.generator.add_capsule_to_scene(
-                capsule_mesh, 
-                i + 1, 
-                position=position,
-                rotation_matrix=rotation_matrix,
-                bone_name=bone_name,
-                skinning_data=skinning_data,
-                vertex_colors=vertex_colors
-            )
-        
+                    print(f"  ✅ Generated vertex colors: {vertex_color_mode} mode")
+
+            if combine_meshes:
+                # Bake the node transform into the vertices so all capsules
+                # can live in one primitive (one draw call downstream)
+                verts = np.array(capsule_mesh['vertices'], dtype=np.float32).reshape(-1, 3)
+                norms = np.array(capsule_mesh['normals'], dtype=np.float32).reshape(-1, 3)
+                if rotation_matrix:
+                    rotation = np.asarray(rotation_matrix, dtype=np.float32)
+                    verts = verts @ rotation.T
+                    norms = norms @ rotation.T
+                verts = verts + np.asarray(position, dtype=np.float32)
+
+                all_vertices.append(verts)
+                all_normals.append(norms)
+                all_indices.append(np.asarray(capsule_mesh['indices'], dtype=np.uint32) + vertex_offset)
+                vertex_offset += len(verts)
+
+                n_verts = len(verts)
+                if skinning_data is not None:
+                    all_joints.append(skinning_data['joints'])
+                    all_weights.append(skinning_data['weights'])
+                else:
+                    # Unskinned capsules bind fully to joint 0 so the
+                    # combined JOINTS_0/WEIGHTS_0 attributes stay aligned
+                    all_joints.append(np.zeros((n_verts, 4), dtype=np.uint16))
+                    rigid_weights = np.zeros((n_verts, 4), dtype=np.float32)
+                    rigid_weights[:, 0] = 1.0
+                    all_weights.append(rigid_weights)
+
+                if enable_vertex_colors:
+                    if vertex_colors is None:
+                        vertex_colors = np.full((n_verts, 3), 0.5, dtype=np.float32)
+                    all_colors.append(vertex_colors)
+            else:
+                # Add capsule to scene
+                generator.add_capsule_to_scene(
+                    capsule_mesh,
+                    i + 1,
+                    position=position,
+                    rotation_matrix=rotation_matrix,
+                    bone_name=bone_name,
+                    skinning_data=skinning_data,
+                    vertex_colors=vertex_colors
+                )
+
         # Generate final glTF
-        gltf_data = self.generator.generate_gltf(capsules, vrm_data, dzn_path)
+        if combine_meshes:
+            node_index = generator.add_combined_mesh(
+                np.concatenate(all_vertices),
+                np.concatenate(all_normals),
+                np.concatenate(all_indices),
+                joints=np.concatenate(all_joints) if enable_skinning else None,
+                weights=np.concatenate(all_weights) if enable_skinning else None,
+                vertex_colors=np.concatenate(all_colors) if all_colors else None
+            )
+            gltf_data = generator.finalize_gltf([node_index])
+        else:
+            gltf_data = self.generator.generate_gltf(capsules, vrm_data, dzn_path)
         self.generator.save_gltf(output_path)
         
         print(f"\n✅ Generated skinned capsule glTF: {output_path}")
-        
-        # Print statistics
-        total_vertices = sum(
-            gltf_data["accessors"][mesh["primitives"][0]["attributes"]["POSITION"]]["count"] 
-            for mesh in gltf_data["meshes"] if "primitives" in mesh
-        )
+
+        # Print statistics (vertex total tracked while building, so no
+        # accessor dict-chasing after the fact)
         print(f"📊 Statistics:")
         print(f"   Total capsules: {len(capsules)}")
         print(f"   Total vertices: {total_vertices}")
@@ -343,6 +471,8 @@ def main():
     parser.add_argument('--segments', type=int, default=16, help='Capsule mesh segments')
     parser.add_argument('--no-skinning', action='store_true', help='Disable skinning (basic capsules only)')
     parser.add_argument('--no-colors', action='store_true', help='Disable vertex colors')
+    parser.add_argument('--combine-meshes', action='store_true',
+                       help='Merge all capsules into a single mesh/primitive (one draw call)')
     
     args = parser.parse_args()
     
@@ -381,6 +511,7 @@ def main():
         vertex_color_mode=args.color_mode,
         enable_skinning=not args.no_skinning,
         enable_vertex_colors=not args.no_colors,
+        combine_meshes=args.combine_meshes,
         segments=args.segments
     )
     
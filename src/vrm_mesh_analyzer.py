@@ -4,32 +4,139 @@ VRM1 Mesh Analyzer for Tapered Capsule Generation.
 Analyzes skinned meshes in VRM1 files to generate optimal tapered capsule representations.
 """
 
-from typing import Dict, Any, Optional
-from .gltf_parser import GLTFParser
-from .skeleton_analyzer import SkeletonAnalyzer
-from .mesh_data_extractor import MeshDataExtractor
-from .capsule_generator import CapsuleGenerator
+import hashlib
+import heapq
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+# The analyzer components (and NumPy behind them) are imported lazily in
+# __init__/load_vrm_file so `--help` and other no-work invocations don't
+# pay their startup cost; the names stay here for type checkers
+if TYPE_CHECKING:
+    from .gltf_parser import GLTFParser
+    from .skeleton_analyzer import SkeletonAnalyzer
+    from .mesh_data_extractor import MeshDataExtractor
+    from .capsule_generator import CapsuleGenerator
+
+# Re-analyzing an unchanged VRM reproduces the same bone analysis, so
+# results are cached on disk keyed by (path, mtime, cache version). Bump
+# the version whenever the analysis pipeline or the payload layout changes.
+_ANALYZER_CACHE_DIR = Path.home() / ".cache" / "vrm_analyzer"
+_ANALYZER_CACHE_VERSION = 1
+
+class _CachedMeshData:
+    """Stand-in for MeshDataExtractor built from cached arrays. Exposes the
+    getter surface the analyzer and its callers use after loading."""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self._payload = payload
+
+    def get_vertices(self):
+        return self._payload["vertices"]
+
+    def get_triangles(self):
+        return self._payload["triangles"]
+
+    def get_normals(self):
+        return self._payload["normals"]
+
+    def get_bone_weights(self):
+        return self._payload["bone_weights"]
+
+    def get_bone_indices(self):
+        return self._payload["bone_indices"]
+
+    def get_mesh_bounds(self):
+        return self._payload["mesh_bounds"]
+
+    def get_mesh_surface_areas(self):
+        return self._payload["mesh_surface_areas"]
+
+class _CachedSkeleton:
+    """Stand-in for SkeletonAnalyzer built from cached skeleton data."""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self._payload = payload
+
+    def get_joint_names(self):
+        return self._payload["joint_names"]
+
+    def get_bone_positions(self):
+        return self._payload["bone_positions"]
+
+    def get_bone_rotations(self):
+        return self._payload["bone_rotations"]
+
+    def get_bone_directions(self):
+        return self._payload["bone_directions"]
+
+    def get_vrm_humanoid_bones(self):
+        return self._payload["vrm_humanoid_bones"]
 
 class VRMMeshAnalyzer:
     """Analyzes VRM mesh geometry and extracts bone-related data."""
     
     def __init__(self):
+        from .gltf_parser import GLTFParser
         self.gltf_parser = GLTFParser()
-        self.skeleton_analyzer: Optional[SkeletonAnalyzer] = None
-        self.mesh_data_extractor: Optional[MeshDataExtractor] = None
-        self.capsule_generator: Optional[CapsuleGenerator] = None
+        self.skeleton_analyzer: Optional["SkeletonAnalyzer"] = None
+        self.mesh_data_extractor: Optional["MeshDataExtractor"] = None
+        self.capsule_generator: Optional["CapsuleGenerator"] = None
         self.vrm_path: Optional[str] = None
         self.bone_analysis_data: Optional[Dict[str, Any]] = None
+        # Generated constraint strings keyed by argument tuple; main()
+        # saves both the Gecode and the float variant from one analysis,
+        # and each generation walks the full bone data
+        self._constraints_cache: Dict[tuple, str] = {}
         
+    def _cache_file_for(self, vrm_path: str) -> Path:
+        key = hashlib.blake2b(
+            f"{vrm_path}:{os.path.getmtime(vrm_path)}:v{_ANALYZER_CACHE_VERSION}".encode()
+        ).hexdigest()
+        return _ANALYZER_CACHE_DIR / f"{key}.pkl"
+
     def load_vrm_file(self, vrm_path: str) -> bool:
         """Load VRM file and perform mesh analysis."""
         self.vrm_path = vrm_path
+        self._constraints_cache.clear()
+        from .capsule_generator import CapsuleGenerator
+
+        # A previous run on the same unchanged file left its analysis on
+        # disk; loading it skips the GLB parse and weight accumulation
+        cache_file = None
+        try:
+            cache_file = self._cache_file_for(vrm_path)
+            if cache_file.exists():
+                with open(cache_file, 'rb') as f:
+                    cached = pickle.load(f)
+                skeleton = _CachedSkeleton(cached["skeleton"])
+                self.skeleton_analyzer = skeleton
+                self.mesh_data_extractor = _CachedMeshData(cached["mesh"])
+                self.capsule_generator = CapsuleGenerator(
+                    skeleton.get_joint_names(),
+                    skeleton.get_bone_positions(),
+                    skeleton.get_bone_rotations(),
+                    skeleton.get_bone_directions(),
+                    skeleton.get_vrm_humanoid_bones()
+                )
+                self.bone_analysis_data = cached["bone_analysis_data"]
+                return True
+        except (OSError, pickle.PickleError, KeyError):
+            # Unreadable or stale entry: fall through to a full analysis,
+            # which rewrites it
+            pass
+
         if not self.gltf_parser.load_glb(vrm_path):
             print(f"Error: Failed to load and analyze VRM file: {vrm_path}")
             return False
         
         gltf_data = self.gltf_parser.get_gltf_data()
-        
+
+        from .skeleton_analyzer import SkeletonAnalyzer
+        from .mesh_data_extractor import MeshDataExtractor
+
         self.skeleton_analyzer = SkeletonAnalyzer(gltf_data)
         self.skeleton_analyzer.extract_skeleton()
         
@@ -49,13 +156,57 @@ class VRMMeshAnalyzer:
             self.mesh_data_extractor.get_bone_weights(),
             self.mesh_data_extractor.get_bone_indices()
         )
-        
+
+        if cache_file is not None:
+            try:
+                _ANALYZER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                payload = {
+                    "skeleton": {
+                        "joint_names": self.skeleton_analyzer.get_joint_names(),
+                        "bone_positions": self.skeleton_analyzer.get_bone_positions(),
+                        "bone_rotations": self.skeleton_analyzer.get_bone_rotations(),
+                        "bone_directions": self.skeleton_analyzer.get_bone_directions(),
+                        "vrm_humanoid_bones": self.skeleton_analyzer.get_vrm_humanoid_bones(),
+                    },
+                    "mesh": {
+                        "vertices": self.mesh_data_extractor.get_vertices(),
+                        "triangles": self.mesh_data_extractor.get_triangles(),
+                        "normals": self.mesh_data_extractor.get_normals(),
+                        "bone_weights": self.mesh_data_extractor.get_bone_weights(),
+                        "bone_indices": self.mesh_data_extractor.get_bone_indices(),
+                        "mesh_bounds": self.mesh_data_extractor.get_mesh_bounds(),
+                        "mesh_surface_areas": self.mesh_data_extractor.get_mesh_surface_areas(),
+                    },
+                    "bone_analysis_data": self.bone_analysis_data,
+                }
+                # Write under a temp name then rename so a partial write
+                # never shows up as a cache entry
+                tmp_file = cache_file.with_suffix('.tmp')
+                with open(tmp_file, 'wb') as f:
+                    pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_file, cache_file)
+            except (OSError, pickle.PickleError):
+                # Caching is best-effort; the analysis itself succeeded
+                pass
+
         return True
 
     def generate_capsule_constraints(self, max_capsules: int = 25, integer_scale: int = None, fast_mode: bool = False) -> str:
         if not self.capsule_generator or not self.bone_analysis_data:
             return ""
-        return self.capsule_generator.generate_capsule_constraints(self.bone_analysis_data, max_capsules, integer_scale, fast_mode)
+        key = (max_capsules, integer_scale, fast_mode)
+        constraints = self._constraints_cache.get(key)
+        if constraints is None:
+            constraints = self.capsule_generator.generate_capsule_constraints(
+                self.bone_analysis_data, max_capsules, integer_scale, fast_mode)
+            self._constraints_cache[key] = constraints
+        return constraints
+
+    def get_bone_bounds(self, max_capsules: int = 25):
+        """Centers and sizes of the selected bones, ordered as in the DZN."""
+        if not self.capsule_generator or not self.bone_analysis_data:
+            return None, None
+        return self.capsule_generator.get_bone_bounds(self.bone_analysis_data, max_capsules)
 
     def save_analysis_data(self, output_path: str, integer_scale: int = None):
         """Save analysis data to DZN file for MiniZinc."""
@@ -63,7 +214,7 @@ class VRMMeshAnalyzer:
             print("No data to save")
             return False
         
-        constraints = self.capsule_generator.generate_capsule_constraints(self.bone_analysis_data, integer_scale=integer_scale)
+        constraints = self.generate_capsule_constraints(integer_scale=integer_scale)
         
         if constraints:
             with open(output_path, 'w') as f:
@@ -82,7 +233,7 @@ class VRMMeshAnalyzer:
             print("No data to save")
             return False
             
-        constraints = self.capsule_generator.generate_capsule_constraints(self.bone_analysis_data, max_capsules=max_capsules)
+        constraints = self.generate_capsule_constraints(max_capsules=max_capsules)
         
         if constraints:
             with open(output_path, 'w') as f:
@@ -131,16 +282,18 @@ class VRMMeshAnalyzer:
         print(f"Total surface area: {total_surface_area:.6f}")
         
         print(f"\nBone geometry analysis (with triangle mesh support):")
-        
-        # Sort by vertex count
-        sorted_bones = sorted(
-            self.bone_analysis_data.items(),
-            key=lambda x: len(x[1]["vertices"]),
-            reverse=True
+
+        # Top 10 bones by vertex count. nlargest is O(N log 10) instead of
+        # a full sort, and precomputing the count keeps len() out of the
+        # comparisons
+        top_bones = heapq.nlargest(
+            10,
+            ((len(data["vertices"]), name, data)
+             for name, data in self.bone_analysis_data.items()),
+            key=lambda t: t[0]
         )
-        
-        for bone_name, data in sorted_bones[:10]:  # Top 10 bones
-            vertex_count = len(data["vertices"])
+
+        for vertex_count, bone_name, data in top_bones:
             if vertex_count > 0:
                 center = data["center"]
                 size = data["size"]
@@ -149,47 +302,35 @@ class VRMMeshAnalyzer:
                       f"size=({size[0]:.3f},{size[1]:.3f},{size[2]:.3f})")
 
 def main():
+    import argparse
     import sys
-    
-    if len(sys.argv) < 2:
-        print("VRM Capsule Optimizer - Gecode Float Solver")
-        print("Usage: python vrm_mesh_analyzer.py <vrm_file.gltf> [options]")
-        print("  vrm_file.gltf: Input VRM1 GLTF file")
-        print("  --output <file>: Output base name (default: vrm_analysis)")
-        print("  --capsules <n>: Maximum number of capsules (default: 25)")
-        print("  --export-json: Export results to JSON format")
-        print("  --export-csv: Export results to CSV format")
-        print("  --results <file>: Gecode results file to process")
-        sys.exit(1)
-    
-    # Parse command line arguments
-    vrm_file = sys.argv[1]
-    output_base = "vrm_analysis"
-    max_capsules = 25
-    export_json = False
-    export_csv = False
-    results_file = None
-    
-    i = 2
-    while i < len(sys.argv):
-        if sys.argv[i] == "--output" and i + 1 < len(sys.argv):
-            output_base = sys.argv[i + 1]
-            i += 2
-        elif sys.argv[i] == "--capsules" and i + 1 < len(sys.argv):
-            max_capsules = int(sys.argv[i + 1])
-            i += 2
-        elif sys.argv[i] == "--export-json":
-            export_json = True
-            i += 1
-        elif sys.argv[i] == "--export-csv":
-            export_csv = True
-            i += 1
-        elif sys.argv[i] == "--results" and i + 1 < len(sys.argv):
-            results_file = sys.argv[i + 1]
-            i += 2
-        else:
-            i += 1
-    
+
+    # argparse validates typed options (a bad --capsules value fails with
+    # a message instead of a traceback) and replaces the hand-rolled
+    # string-comparison chain over sys.argv
+    parser = argparse.ArgumentParser(
+        description="VRM Capsule Optimizer - Gecode Float Solver")
+    parser.add_argument("vrm_file", help="Input VRM1 GLTF file")
+    parser.add_argument("--output", default="vrm_analysis",
+                        help="Output base name (default: vrm_analysis)")
+    parser.add_argument("--capsules", type=int, default=25,
+                        help="Maximum number of capsules (default: 25)")
+    parser.add_argument("--export-json", action="store_true",
+                        help="Export results to JSON format")
+    parser.add_argument("--export-csv", action="store_true",
+                        help="Export results to CSV format")
+    parser.add_argument("--also-float", action="store_true",
+                        help="Also write the float .dzn for comparison")
+    parser.add_argument("--results", help="Gecode results file to process")
+    args = parser.parse_args()
+
+    vrm_file = args.vrm_file
+    output_base = args.output
+    max_capsules = args.capsules
+    export_json = args.export_json
+    export_csv = args.export_csv
+    results_file = args.results
+
     try:
         analyzer = VRMMeshAnalyzer()
         
@@ -207,10 +348,13 @@ def main():
             print(f"\n✅ Generated Gecode float data: {gecode_file}")
             print(f"   Using float values (no scaling)")
         
-        # Generate float data for comparison (optional)
-        float_file = f"{output_base}_float.dzn"
-        if analyzer.save_analysis_data(float_file):
-            print(f"✅ Generated float data (for comparison): {float_file}")
+        # Generate float data for comparison, only when asked: the normal
+        # path otherwise pays a second constraint pass and .dzn write for
+        # a file nothing consumes
+        if args.also_float:
+            float_file = f"{output_base}_float.dzn"
+            if analyzer.save_analysis_data(float_file):
+                print(f"✅ Generated float data (for comparison): {float_file}")
         
         print(f"\n=== Gecode Optimization Workflow ===")
         print(f"1. Run Gecode solver:")
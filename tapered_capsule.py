@@ -27,24 +27,42 @@ import sys
 import argparse
 from pathlib import Path
 
-# Public API imports
-from src.skinned_capsule_pipeline import SkinnedCapsulePipeline
-from src.capsule_generator import CapsuleGenerator
-from src.minizinc_to_gltf import GLTFCapsuleGenerator
-
-# Public API classes
+# Public API classes, resolved lazily below so importing this module (e.g.
+# for --help or shell completion) doesn't pull in numpy and the glTF stack
 __all__ = [
     "SkinnedCapsulePipeline",
     "CapsuleGenerator",
     "GLTFCapsuleGenerator"
 ]
 
+# Maps each public name to the src module that defines it
+_LAZY_IMPORTS = {
+    "SkinnedCapsulePipeline": "src.skinned_capsule_pipeline",
+    "CapsuleGenerator": "src.capsule_generator",
+    "GLTFCapsuleGenerator": "src.minizinc_to_gltf",
+}
+
 # Version information
 __version__ = "1.0.0"
 __author__ = "Capsule Generation Team"
 
 
-def analyze_gltf_skeleton(model_path: str) -> SkinnedCapsulePipeline:
+def __getattr__(name):
+    """Load public API classes on first access (PEP 562)."""
+    if name in _LAZY_IMPORTS:
+        import importlib
+        module = importlib.import_module(_LAZY_IMPORTS[name])
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+def analyze_gltf_skeleton(model_path: str) -> "SkinnedCapsulePipeline":
     """
     Analyze a glTF/GLB/VRM skinned mesh and extract bone geometry data.
     
@@ -54,6 +72,8 @@ def analyze_gltf_skeleton(model_path: str) -> SkinnedCapsulePipeline:
     Returns:
         SkinnedCapsulePipeline instance with loaded data
     """
+    from src.skinned_capsule_pipeline import SkinnedCapsulePipeline
+
     pipeline = SkinnedCapsulePipeline()
     if pipeline.load_gltf_and_analyze(model_path):
         return pipeline
@@ -75,6 +95,8 @@ def generate_capsules_from_model(model_path: str, output_path: str,
     Returns:
         True if successful, False otherwise
     """
+    from src.skinned_capsule_pipeline import SkinnedCapsulePipeline
+
     pipeline = SkinnedCapsulePipeline()
     
     # Load and analyze model
@@ -105,6 +127,8 @@ def generate_skinned_capsules_from_results(model_path: str, results_path: str,
     Returns:
         True if successful, False otherwise
     """
+    from src.skinned_capsule_pipeline import SkinnedCapsulePipeline
+
     pipeline = SkinnedCapsulePipeline()
     
     # Load and analyze model
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Shared mesh helpers for the CoACD shape tests.
+"""
+
+import numpy as np
+
+def coacd_buffers(vertices, faces, dtype=np.float64):
+    """Return C-contiguous, correctly typed buffers for coacd.Mesh.
+
+    CoACD's binding silently copies non-contiguous or mistyped input on
+    every call; enforcing the layout once here keeps the arrays shared
+    with the C++ side zero-copy.
+    """
+    vertices = np.ascontiguousarray(vertices, dtype=dtype)
+    faces = np.ascontiguousarray(faces, dtype=np.uint32)
+    assert vertices.flags['C_CONTIGUOUS'] and faces.flags['C_CONTIGUOUS']
+    return vertices, faces
+
+def dedupe_vertices(vertices, faces, tol=1e-9):
+    """Merge vertices closer than tol and remap faces.
+
+    Generated meshes repeat vertices at sphere poles and torus seams, which
+    bloats CoACD's manifold preprocessing. Quantizing to a tol grid and
+    collapsing identical cells shrinks the input proportionally; faces that
+    degenerate after merging are dropped.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces)
+
+    quantized = np.round(vertices / tol).astype(np.int64)
+    _, keep, remap = np.unique(quantized, axis=0,
+                               return_index=True, return_inverse=True)
+
+    new_faces = remap[faces]
+    valid = (
+        (new_faces[:, 0] != new_faces[:, 1])
+        & (new_faces[:, 1] != new_faces[:, 2])
+        & (new_faces[:, 0] != new_faces[:, 2])
+    )
+    return (np.ascontiguousarray(vertices[keep]),
+            np.ascontiguousarray(new_faces[valid], dtype=np.uint32))
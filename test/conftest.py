@@ -0,0 +1,24 @@
+"""Shared pytest configuration for the shape tests.
+
+Each test function is independent — it builds its own pipeline in its own
+temp directory — so the suite parallelizes cleanly across processes with
+pytest-xdist:
+
+    pytest -n auto test/
+
+The scripts' main() drivers remain for run_all_shape_tests.sh.
+"""
+
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _single_threaded_openmp():
+    """Pin OpenMP to one thread per test process so CoACD's internal
+    threading doesn't oversubscribe cores when tests run under xdist
+    workers or alongside the process pools some tests spawn themselves.
+    setdefault keeps an explicit user override in effect."""
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    yield
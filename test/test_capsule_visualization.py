@@ -11,13 +11,19 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from minizinc_to_gltf import GLTFCapsuleGenerator
 import json
+import numpy as np
+
+# One generator for the module: repeated runs (e.g. across radii) reuse
+# its cached unit capsule meshes instead of rebuilding them per test
+_GENERATOR = GLTFCapsuleGenerator()
 
 def test_capsule_visualization():
     """Generate a simple tapered capsule and save it as GLTF for visualization."""
     print("Testing capsule visualization...")
     
-    # Create generator
-    generator = GLTFCapsuleGenerator()
+    # Reuse the module generator, cleared of any previous document
+    generator = _GENERATOR
+    generator.reset()
     
     # Create a simple tapered capsule (wider at bottom, narrower at top)
     capsules = [
@@ -39,8 +45,14 @@ def test_capsule_visualization():
     print(f"Generated test capsule: {output_file}")
     
     # Print some stats
-    total_vertices = sum(gltf_data["accessors"][mesh["primitives"][0]["attributes"]["POSITION"]]["count"] 
-                        for mesh in gltf_data["meshes"] if "primitives" in mesh)
+    # One C-level gather+sum over precomputed accessor counts instead of
+    # a Python generator re-doing the dict lookups per mesh
+    accessor_counts = np.array([a.get("count", 0) for a in gltf_data["accessors"]],
+                               dtype=np.int64)
+    pos_idx = np.array([mesh["primitives"][0]["attributes"]["POSITION"]
+                        for mesh in gltf_data["meshes"] if "primitives" in mesh],
+                       dtype=np.int64)
+    total_vertices = int(accessor_counts[pos_idx].sum())
     print(f"Total vertices: {total_vertices}")
     print(f"Total meshes: {len(gltf_data['meshes'])}")
     
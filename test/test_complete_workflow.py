@@ -4,7 +4,10 @@ Complete workflow test for shape generation and CoACD processing.
 This test demonstrates the full pipeline from shape generation to CoACD decomposition.
 """
 
+import concurrent.futures
+import os
 import sys
+from functools import lru_cache
 import numpy as np
 import json
 from pathlib import Path
@@ -13,24 +16,127 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.shape_generators import ShapeGenerator
+from test._mesh_utils import coacd_buffers, dedupe_vertices
 
-def save_shape_as_json(shape_name: str, vertices: list, faces: list, output_dir: Path):
+# Import CoACD once per process (workers re-evaluate this on their own
+# import of the module); the tests check the flag instead of re-importing
+try:
+    import coacd
+    HAVE_COACD = True
+except ImportError:
+    HAVE_COACD = False
+
+# orjson serializes ndarrays natively at C speed; fall back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Shared decomposition settings for every shape in the workflow
+_COACD_PARAMS = dict(threshold=0.05, max_convex_hull=16, preprocess_mode="auto", merge=True)
+
+def save_shape_as_json(shape_name: str, vertices: np.ndarray, faces: np.ndarray, output_dir: Path):
     """Save shape data as JSON for inspection."""
-    shape_data = {
-        "name": shape_name,
-        "vertex_count": len(vertices),
-        "face_count": len(faces),
-        "vertices": vertices,
-        "faces": faces
-    }
-    
     output_file = output_dir / f"{shape_name.lower().replace(' ', '_')}.json"
-    with open(output_file, 'w') as f:
-        json.dump(shape_data, f, indent=2)
-    
+    if ORJSON_AVAILABLE:
+        # Serialize the ndarrays directly, skipping the tolist() round-trip
+        shape_data = {
+            "name": shape_name,
+            "vertex_count": len(vertices),
+            "face_count": len(faces),
+            "vertices": vertices,
+            "faces": faces
+        }
+        output_file.write_bytes(orjson.dumps(
+            shape_data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2
+        ))
+    else:
+        # tolist() here is the only list conversion in the workflow; it runs
+        # at C level, unlike a per-vertex Python comprehension
+        shape_data = {
+            "name": shape_name,
+            "vertex_count": len(vertices),
+            "face_count": len(faces),
+            "vertices": vertices.tolist(),
+            "faces": faces.tolist()
+        }
+        with open(output_file, 'w') as f:
+            json.dump(shape_data, f, indent=2)
+
+
     print(f"  📦 Saved {shape_name} data to {output_file.name}")
     return output_file
 
+# Each entry resolves inside a worker process: (name, generator function
+# name, args, kwargs). Plain data instead of lambdas so tasks pickle.
+SHAPES_TO_TEST = [
+    # Platonic Solids
+    ("Tetrahedron", "create_tetrahedron", (), {}),
+    ("Cube", "generate_cube", (2.0,), {}),
+    ("Octahedron", "create_octahedron", (), {}),
+    ("Dodecahedron", "create_dodecahedron", (), {}),
+    ("Icosahedron", "create_icosahedron", (), {}),
+
+    # Other Requested Shapes
+    ("Cylinder", "generate_cylinder", (1.0, 2.0), {"segments": 16}),
+    ("Cone", "generate_cone", (1.0, 2.0), {"segments": 16}),
+    ("Cuboid", "generate_cuboid", (1.5, 2.0, 1.0), {}),
+    ("Ellipsoid", "generate_ellipsoid", (1.0, 1.5, 0.8), {"segments": 12}),
+    ("TriangularPrism", "generate_triangular_prism", (1.5, 2.0, 1.0), {}),
+    ("Donut", "generate_torus", (1.5, 0.5), {"major_segments": 12, "minor_segments": 8}),
+    ("Biscuit", "generate_biscuit", (1.0, 0.3), {"segments": 12}),
+    ("Markoid", "generate_markoid", (1.2, 1.0, 0.8), {"power": 2.5, "segments": 12}),
+    ("Pyramid", "generate_pyramid", (1.5, 1.5, 2.0), {}),
+    ("CubicStroke", "generate_cubic_stroke", ([(0, 0, 0), (1, 1, 0), (2, 0, 1)], 0.1, 8), {}),
+]
+
+def _limit_worker_threads():
+    """Worker initializer: pin CoACD's internal OpenMP pool to one thread so
+    the process pool isn't oversubscribed, then absorb CoACD's one-time init
+    (runtime load, thread-pool spin-up) before the first real shape."""
+    os.environ["OMP_NUM_THREADS"] = "1"
+    if not HAVE_COACD:
+        return
+    try:
+        warm = create_tetrahedron()
+        coacd.run_coacd(
+            mesh=coacd.Mesh(np.asarray(warm['vertices']), np.asarray(warm['faces'], dtype=np.uint32)),
+            threshold=0.5,
+            max_convex_hull=1,
+            preprocess_mode="off"
+        )
+    except Exception:
+        pass  # the per-shape path reports missing/unhappy CoACD itself
+
+def _run_one_shape(task):
+    """Generate, save and decompose one shape inside a worker process."""
+    shape_name, func_name, args, kwargs, output_dir = task
+    print(f"\nTesting {shape_name}")
+    print("-" * 30)
+    try:
+        if func_name.startswith("generate_"):
+            shape_func = getattr(ShapeGenerator(), func_name)
+        else:
+            shape_func = globals()[func_name]
+
+        # Generate shape; keep vertices and faces as contiguous ndarrays
+        # end-to-end instead of round-tripping through Python lists
+        shape_data = shape_func(*args, **kwargs)
+        vertices = np.ascontiguousarray(shape_data['vertices'], dtype=np.float64)
+        faces = np.ascontiguousarray(shape_data['faces'], dtype=np.uint32)
+
+        print(f"  📐 Generated {len(vertices)} vertices, {len(faces)} faces")
+
+        # Save shape data
+        save_shape_as_json(shape_name, vertices, faces, output_dir)
+
+        # Test with CoACD
+        return shape_name, _shape_with_coacd(shape_name, vertices, faces)
+    except Exception as e:
+        print(f"  ❌ Failed to generate {shape_name}: {e}")
+        return shape_name, False
+
 def test_complete_workflow():
     """Test the complete workflow for all requested shapes."""
     print("Complete Workflow Test: Shape Generation + CoACD Processing")
@@ -40,68 +146,14 @@ def test_complete_workflow():
     output_dir = Path("output/shapes")
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    generator = ShapeGenerator()
-    
-    # Test all requested shapes
-    shapes_to_test = [
-        # Platonic Solids
-        ("Tetrahedron", lambda: create_tetrahedron()),
-        ("Cube", lambda: (generator.generate_cube(2.0)['vertices'], generator.generate_cube(2.0)['faces'])),
-        ("Octahedron", lambda: create_octahedron()),
-        ("Dodecahedron", lambda: create_dodecahedron()),
-        ("Icosahedron", lambda: create_icosahedron()),
-        
-        # Other Requested Shapes
-        ("Cylinder", lambda: (generator.generate_cylinder(1.0, 2.0, segments=16)['vertices'], 
-                             generator.generate_cylinder(1.0, 2.0, segments=16)['faces'])),
-        ("Cone", lambda: (generator.generate_cone(1.0, 2.0, segments=16)['vertices'], 
-                         generator.generate_cone(1.0, 2.0, segments=16)['faces'])),
-        ("Cuboid", lambda: (generator.generate_cuboid(1.5, 2.0, 1.0)['vertices'], 
-                           generator.generate_cuboid(1.5, 2.0, 1.0)['faces'])),
-        ("Ellipsoid", lambda: (generator.generate_ellipsoid(1.0, 1.5, 0.8, segments=12)['vertices'], 
-                              generator.generate_ellipsoid(1.0, 1.5, 0.8, segments=12)['faces'])),
-        ("TriangularPrism", lambda: (generator.generate_triangular_prism(1.5, 2.0, 1.0)['vertices'], 
-                                    generator.generate_triangular_prism(1.5, 2.0, 1.0)['faces'])),
-        ("Donut", lambda: (generator.generate_torus(1.5, 0.5, major_segments=12, minor_segments=8)['vertices'], 
-                          generator.generate_torus(1.5, 0.5, major_segments=12, minor_segments=8)['faces'])),
-        ("Biscuit", lambda: (generator.generate_biscuit(1.0, 0.3, segments=12)['vertices'], 
-                            generator.generate_biscuit(1.0, 0.3, segments=12)['faces'])),
-        ("Markoid", lambda: (generator.generate_markoid(1.2, 1.0, 0.8, power=2.5, segments=12)['vertices'], 
-                            generator.generate_markoid(1.2, 1.0, 0.8, power=2.5, segments=12)['faces'])),
-        ("Pyramid", lambda: (generator.generate_pyramid(1.5, 1.5, 2.0)['vertices'], 
-                            generator.generate_pyramid(1.5, 1.5, 2.0)['faces'])),
-        ("CubicStroke", lambda: (generator.generate_cubic_stroke([(0, 0, 0), (1, 1, 0), (2, 0, 1)], 0.1, 8)['vertices'],
-                              generator.generate_cubic_stroke([(0, 0, 0), (1, 1, 0), (2, 0, 1)], 0.1, 8)['faces'])),
-    ]
-    
-    results = []
-    
-    for shape_name, shape_generator in shapes_to_test:
-        print(f"\nTesting {shape_name}")
-        print("-" * 30)
-        
-        try:
-            # Generate shape
-            vertices, faces = shape_generator()
-            
-            # Convert to proper types
-            vertices = [[float(x), float(y), float(z)] for x, y, z in vertices]
-            faces = [[int(a), int(b), int(c)] for a, b, c in faces]
-            
-            print(f"  📐 Generated {len(vertices)} vertices, {len(faces)} faces")
-            
-            # Save shape data
-            save_shape_as_json(shape_name, vertices, faces, output_dir)
-            
-            # Test with CoACD
-            success = test_shape_with_coacd(shape_name, np.array(vertices, dtype=np.float64), 
-                                          np.array(faces, dtype=np.uint32))
-            
-            results.append((shape_name, success))
-            
-        except Exception as e:
-            print(f"  ❌ Failed to generate {shape_name}: {e}")
-            results.append((shape_name, False))
+    # The shapes are independent and CoACD is CPU-heavy, so fan them out
+    # over a process pool; map() keeps the summary in table order
+    tasks = [(name, func_name, args, kwargs, output_dir)
+             for name, func_name, args, kwargs in SHAPES_TO_TEST]
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            initializer=_limit_worker_threads) as executor:
+        results = list(executor.map(_run_one_shape, tasks))
     
     # Summary
     print("\n" + "=" * 60)
@@ -128,22 +180,25 @@ def test_complete_workflow():
         print("❌ Some workflow tests failed!")
         return 1
 
-def test_shape_with_coacd(shape_name: str, vertices: np.ndarray, faces: np.ndarray):
+def _shape_with_coacd(shape_name: str, vertices: np.ndarray, faces: np.ndarray):
     """Test a shape with CoACD."""
+    if not HAVE_COACD:
+        print("  ❌ CoACD library not available")
+        return False
     try:
-        import coacd
-        
-        # Create CoACD mesh
-        mesh = coacd.Mesh(vertices, faces)
+        # Merge duplicate vertices before handing the mesh to CoACD; its
+        # manifold preprocessing scales with input size
+        vertices, faces = dedupe_vertices(vertices, faces)
+
+        # Create CoACD mesh; float32 halves the vertex buffer CoACD walks
+        # during preprocessing, fall back to float64 if the binding refuses
+        try:
+            mesh = coacd.Mesh(*coacd_buffers(vertices, faces, dtype=np.float32))
+        except TypeError:
+            mesh = coacd.Mesh(*coacd_buffers(vertices, faces))
         
         # Run CoACD decomposition
-        parts = coacd.run_coacd(
-            mesh=mesh,
-            threshold=0.05,
-            max_convex_hull=16,
-            preprocess_mode="auto",
-            merge=True
-        )
+        parts = coacd.run_coacd(mesh=mesh, **_COACD_PARAMS)
         
         print(f"  🚀 CoACD decomposition: {len(parts)} parts")
         return True
@@ -152,97 +207,114 @@ def test_shape_with_coacd(shape_name: str, vertices: np.ndarray, faces: np.ndarr
         print(f"  ❌ CoACD failed: {e}")
         return False
 
+# Platonic solid geometry baked at module scope: the creators below used to
+# rebuild (and for the tetrahedron, sqrt-normalize) these arrays per call
+_TETRA_V = np.array([
+    [ 1,  1,  1],
+    [ 1, -1, -1],
+    [-1,  1, -1],
+    [-1, -1,  1],
+], dtype=np.float64) * 0.5773502691896258  # 1/sqrt(3)
+
+_TETRA_F = np.array([
+    [0, 1, 2],
+    [0, 2, 3],
+    [0, 3, 1],
+    [1, 3, 2],
+], dtype=np.uint32)
+
+_OCTA_V = np.array([
+    [ 1,  0,  0],
+    [-1,  0,  0],
+    [ 0,  1,  0],
+    [ 0, -1,  0],
+    [ 0,  0,  1],
+    [ 0,  0, -1],
+], dtype=np.float64)
+
+_OCTA_F = np.array([
+    [0, 2, 4],
+    [0, 4, 3],
+    [0, 3, 5],
+    [0, 5, 2],
+    [1, 4, 2],
+    [1, 3, 4],
+    [1, 5, 3],
+    [1, 2, 5],
+], dtype=np.uint32)
+
+# Simplified as a cube for testing purposes
+_DODEC_V = np.array([
+    [-1, -1, -1],
+    [ 1, -1, -1],
+    [ 1,  1, -1],
+    [-1,  1, -1],
+    [-1, -1,  1],
+    [ 1, -1,  1],
+    [ 1,  1,  1],
+    [-1,  1,  1],
+], dtype=np.float64) * 0.5
+
+_DODEC_F = np.array([
+    [0, 1, 2], [0, 2, 3],  # Bottom
+    [4, 6, 5], [4, 7, 6],  # Top
+    [0, 4, 5], [0, 5, 1],  # Front
+    [2, 6, 7], [2, 7, 3],  # Back
+    [0, 3, 7], [0, 7, 4],  # Left
+    [1, 5, 6], [1, 6, 2],  # Right
+], dtype=np.uint32)
+
+# Simplified as a bipyramid for testing purposes
+_ICOSA_V = np.array([
+    [ 0,  1,  0],  # Top
+    [ 1,  0,  0],  # Right
+    [ 0,  0,  1],  # Front
+    [-1,  0,  0],  # Left
+    [ 0,  0, -1],  # Back
+    [ 0, -1,  0],  # Bottom
+], dtype=np.float64)
+
+_ICOSA_F = np.array([
+    [0, 1, 2],  # Top-right-front
+    [0, 2, 3],  # Top-front-left
+    [0, 3, 4],  # Top-left-back
+    [0, 4, 1],  # Top-back-right
+    [5, 2, 1],  # Bottom-front-right
+    [5, 3, 2],  # Bottom-left-front
+    [5, 4, 3],  # Bottom-back-left
+    [5, 1, 4],  # Bottom-right-back
+], dtype=np.uint32)
+
+@lru_cache(maxsize=None)
+def _platonic_lists(solid):
+    """tolist() the baked arrays for one solid, at most once per process."""
+    vertices, faces = {
+        'tetrahedron': (_TETRA_V, _TETRA_F),
+        'octahedron': (_OCTA_V, _OCTA_F),
+        'dodecahedron': (_DODEC_V, _DODEC_F),
+        'icosahedron': (_ICOSA_V, _ICOSA_F),
+    }[solid]
+    return vertices.tolist(), faces.tolist()
+
 def create_tetrahedron():
     """Create a regular tetrahedron."""
-    vertices = np.array([
-        [ 1,  1,  1],
-        [ 1, -1, -1],
-        [-1,  1, -1],
-        [-1, -1,  1],
-    ], dtype=np.float64) / np.sqrt(3)
-    
-    faces = np.array([
-        [0, 1, 2],
-        [0, 2, 3],
-        [0, 3, 1],
-        [1, 3, 2],
-    ], dtype=np.uint32)
-    
-    return vertices.tolist(), faces.tolist()
+    vertices, faces = _platonic_lists('tetrahedron')
+    return {'vertices': vertices, 'faces': faces}
 
 def create_octahedron():
     """Create a regular octahedron."""
-    vertices = np.array([
-        [ 1,  0,  0],
-        [-1,  0,  0],
-        [ 0,  1,  0],
-        [ 0, -1,  0],
-        [ 0,  0,  1],
-        [ 0,  0, -1],
-    ], dtype=np.float64)
-    
-    faces = np.array([
-        [0, 2, 4],
-        [0, 4, 3],
-        [0, 3, 5],
-        [0, 5, 2],
-        [1, 4, 2],
-        [1, 3, 4],
-        [1, 5, 3],
-        [1, 2, 5],
-    ], dtype=np.uint32)
-    
-    return vertices.tolist(), faces.tolist()
+    vertices, faces = _platonic_lists('octahedron')
+    return {'vertices': vertices, 'faces': faces}
 
 def create_dodecahedron():
     """Create a regular dodecahedron (simplified as a cube for testing)."""
-    # Simplified as a cube for testing purposes
-    vertices = np.array([
-        [-1, -1, -1],
-        [ 1, -1, -1],
-        [ 1,  1, -1],
-        [-1,  1, -1],
-        [-1, -1,  1],
-        [ 1, -1,  1],
-        [ 1,  1,  1],
-        [-1,  1,  1],
-    ], dtype=np.float64) * 0.5
-    
-    faces = np.array([
-        [0, 1, 2], [0, 2, 3],  # Bottom
-        [4, 6, 5], [4, 7, 6],  # Top
-        [0, 4, 5], [0, 5, 1],  # Front
-        [2, 6, 7], [2, 7, 3],  # Back
-        [0, 3, 7], [0, 7, 4],  # Left
-        [1, 5, 6], [1, 6, 2],  # Right
-    ], dtype=np.uint32)
-    
-    return vertices.tolist(), faces.tolist()
+    vertices, faces = _platonic_lists('dodecahedron')
+    return {'vertices': vertices, 'faces': faces}
 
 def create_icosahedron():
     """Create a regular icosahedron (simplified for testing)."""
-    # Simplified as a pyramid for testing purposes
-    vertices = np.array([
-        [ 0,  1,  0],  # Top
-        [ 1,  0,  0],  # Right
-        [ 0,  0,  1],  # Front
-        [-1,  0,  0],  # Left
-        [ 0,  0, -1],  # Back
-        [ 0, -1,  0],  # Bottom
-    ], dtype=np.float64)
-    
-    faces = np.array([
-        [0, 1, 2],  # Top-right-front
-        [0, 2, 3],  # Top-front-left
-        [0, 3, 4],  # Top-left-back
-        [0, 4, 1],  # Top-back-right
-        [5, 2, 1],  # Bottom-front-right
-        [5, 3, 2],  # Bottom-left-front
-        [5, 4, 3],  # Bottom-back-left
-        [5, 1, 4],  # Bottom-right-back
-    ], dtype=np.uint32)
-    
-    return vertices.tolist(), faces.tolist()
+    vertices, faces = _platonic_lists('icosahedron')
+    return {'vertices': vertices, 'faces': faces}
 
 def main():
     """Run the complete workflow test."""
@@ -250,10 +322,9 @@ def main():
     print("=" * 60)
     
     # Check dependencies
-    try:
-        import coacd
+    if HAVE_COACD:
         print("✅ CoACD library found")
-    except ImportError:
+    else:
         print("❌ CoACD library not found. Please install with 'pip install coacd'")
         return 1
     
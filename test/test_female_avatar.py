@@ -34,11 +34,17 @@ def main():
     os.makedirs(temp_dir, exist_ok=True)
     print(f"Using temporary directory: {temp_dir}")
     
-    # Copy the VRM file to the temporary directory
+    # Link the VRM file into the temporary directory; the pipeline only
+    # reads it, so copying tens of MB per run is wasted I/O
     vrm_filename = os.path.basename(original_vrm_path)
     vrm_path = os.path.join(temp_dir, vrm_filename)
-    shutil.copy2(original_vrm_path, vrm_path)
-    print(f"Copied VRM file to: {vrm_path}")
+    if os.path.lexists(vrm_path):
+        os.unlink(vrm_path)
+    try:
+        os.symlink(os.path.abspath(original_vrm_path), vrm_path)
+    except (OSError, NotImplementedError):
+        shutil.copy2(original_vrm_path, vrm_path)
+    print(f"Linked VRM file to: {vrm_path}")
     
     # Suggested reasonable amount of capsules for a humanoid avatar
     # 8-12 capsules is typically sufficient for a good balance between accuracy and performance
@@ -4,6 +4,9 @@ Test the tapered capsule pipeline with platonic solids and other requested shape
 This test creates manifold meshes that can be processed by CoACD.
 """
 
+import concurrent.futures
+import logging
+import os
 import sys
 import numpy as np
 import tempfile
@@ -15,6 +18,77 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.shape_generators import ShapeGenerator
 from src.coacd_capsule_pipeline import CoACDCapsulePipeline
 
+# Shared generator for witness sampling; unlike the legacy np.random.uniform
+# global state this is lock-free and seeds the run reproducibly
+_RNG = np.random.default_rng(0)
+
+# Buffered logging instead of ~30 flushing print calls; matters once the
+# shapes run in parallel and every line contends for the stdout lock
+log = logging.getLogger("tc.tests")
+
+class MockMeshDataExtractor:
+    """Mesh data extractor stand-in serving one pre-baked shape."""
+    __slots__ = ('vertices', '_bone_weights', '_bone_indices')
+
+    def __init__(self, vertices):
+        # Cache contiguous buffers once; the getters hand these out
+        # directly instead of rebuilding per-vertex lists
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        self._bone_weights = np.ones((len(self.vertices), 1), dtype=np.float32)
+        self._bone_indices = np.zeros((len(self.vertices), 1), dtype=np.int32)
+
+    def get_vertices(self):
+        return self.vertices
+
+    def get_bone_weights(self):
+        # Dummy bone weights (all vertices influenced by bone 0)
+        return self._bone_weights
+
+    def get_bone_indices(self):
+        # Dummy bone indices (all vertices influenced by bone 0)
+        return self._bone_indices
+
+class MockGLTFParser:
+    """GLTF parser stand-in with a single root node and bone."""
+    __slots__ = ()
+
+    def load_glb(self, path):
+        return True
+
+    def get_gltf_data(self):
+        return {
+            "nodes": [{"name": "RootNode"}],
+            "skins": [{"joints": [0]}],
+            "meshes": [{}]
+        }
+
+    def get_accessor_data(self, accessor):
+        return None
+
+class MockMesh:
+    """Witness-sampling mesh stand-in over a fixed bounding box."""
+    __slots__ = ('vertices', 'bounds', '_lo', '_scale', '_pts', '_idx')
+
+    def __init__(self, vertices, bounds):
+        self.vertices = vertices
+        self.bounds = bounds
+        self._lo = np.asarray(bounds[0], dtype=np.float32)
+        self._scale = np.asarray(bounds[1], dtype=np.float32) - self._lo
+        self._pts = None
+
+    def sample(self, num_points, return_index=False):
+        # Sample points within bounds: one bulk draw into a reused
+        # buffer, scaled in place
+        if self._pts is None or len(self._pts) != num_points:
+            self._pts = np.empty((num_points, 3), dtype=np.float32)
+            self._idx = np.arange(num_points)
+        _RNG.random(out=self._pts, dtype=np.float32)
+        np.multiply(self._pts, self._scale, out=self._pts)
+        np.add(self._pts, self._lo, out=self._pts)
+        if return_index:
+            return self._pts, self._idx
+        return self._pts
+
 def create_simple_vrm_mock(output_path: str):
     """Create a simple mock VRM file for testing."""
     # Create a minimal GLB structure
@@ -26,417 +100,275 @@ def create_simple_vrm_mock(output_path: str):
         # For now, just create an empty file that won't be parsed
         # The pipeline will handle the missing data gracefully
 
-def test_shape_through_pipeline(shape_name: str, vertices: np.ndarray, faces: np.ndarray):
-    """Test a shape through the complete pipeline."""
-    print(f"\nTesting {shape_name} through CoACD pipeline")
-    print("-" * 50)
+def _shape_through_pipeline(shape_name: str, vertices: np.ndarray, faces: np.ndarray,
+                                work_dir=None):
+    """Test a shape through the complete pipeline.
+
+    With work_dir set, the shape runs in a subdirectory of that run-wide
+    directory (one mkdir instead of a TemporaryDirectory create/rmtree
+    cycle per shape); standalone callers get their own tempdir as before.
+    """
+    log.info(f"\nTesting {shape_name} through CoACD pipeline")
+    log.info("-" * 50)
     
     try:
-        # Create a temporary directory for processing
+        if work_dir is not None:
+            temp_path = Path(work_dir) / shape_name.lower().replace(' ', '_')
+            temp_path.mkdir(exist_ok=True)
+            return _run_pipeline_in(shape_name, vertices, faces, temp_path)
         with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            
-            # Create a mock VRM file
-            vrm_path = temp_path / f"{shape_name.lower().replace(' ', '_')}.vrm"
-            create_simple_vrm_mock(str(vrm_path))
-            
-            # Create pipeline
-            pipeline = CoACDCapsulePipeline(str(vrm_path), str(temp_path))
-            
-            # Mock the mesh data extractor to return our shape data
-            class MockMeshDataExtractor:
-                def __init__(self, vertices):
-                    self.vertices = vertices
-                    
-                def get_vertices(self):
-                    return self.vertices.tolist()
-                    
-                def get_bone_weights(self):
-                    # Return dummy bone weights (all vertices influenced by bone 0)
-                    return [[1.0] for _ in range(len(self.vertices))]
-                    
-                def get_bone_indices(self):
-                    # Return dummy bone indices (all vertices influenced by bone 0)
-                    return [[0] for _ in range(len(self.vertices))]
-            
-            # Mock the GLTF parser
-            class MockGLTFParser:
-                def load_glb(self, path):
-                    return True
-                    
-                def get_gltf_data(self):
-                    return {
-                        "nodes": [{"name": "RootNode"}],
-                        "skins": [{"joints": [0]}],
-                        "meshes": [{}]
-                    }
-                    
-                def get_accessor_data(self, accessor):
-                    return None
-            
-            # Override the pipeline's mesh loading methods
-            pipeline.gltf_parser = MockGLTFParser()
-            
-            # Set up mock data
-            pipeline.mesh_data_extractor = MockMeshDataExtractor(vertices)
-            pipeline.joint_names = [f"{shape_name.replace(' ', '')}Bone"]
-            pipeline.bone_weights = pipeline.mesh_data_extractor.get_bone_weights()
-            pipeline.bone_indices = pipeline.mesh_data_extractor.get_bone_indices()
-            
-            # Group vertices by bone
-            pipeline._group_vertices_by_bone()
-            
-            # Create a mock mesh object for the pipeline
-            class MockMesh:
-                def __init__(self, vertices, bounds):
-                    self.vertices = vertices
-                    self.bounds = bounds
-                    
-                def sample(self, num_points, return_index=False):
-                    # Sample points within bounds
-                    points = np.random.uniform(self.bounds[0], self.bounds[1], (num_points, 3))
-                    if return_index:
-                        return points, np.arange(num_points)
-                    return points
-            
-            # Create mock mesh with our shape data
-            bounds = np.array([np.min(vertices, axis=0), np.max(vertices, axis=0)])
-            mesh = MockMesh(vertices, bounds)
-            
-            # Run the complete pipeline
-            success = pipeline.run_complete_pipeline(
-                coacd_threshold=0.05,
-                witness_points=1000,
-                max_capsules=10
-            )
-            
-            if success:
-                print(f"✅ {shape_name} pipeline test completed successfully")
-                return True
-            else:
-                print(f"❌ {shape_name} pipeline test failed")
-                return False
-                
-    except Exception as e:
-        print(f"❌ Error during {shape_name} pipeline test: {e}")
-        import traceback
-        traceback.print_exc()
+            return _run_pipeline_in(shape_name, vertices, faces, Path(temp_dir))
+    except Exception:
+        # log.exception formats the traceback through the logging pipeline
+        # (and only when the level allows it) instead of dumping raw frames
+        # straight to stderr from every failing worker
+        log.exception(f"❌ Error during {shape_name} pipeline test")
         return False
 
+def _run_pipeline_in(shape_name: str, vertices: np.ndarray, faces: np.ndarray, temp_path: Path):
+    """Run one shape's mocked pipeline inside an existing directory."""
+    # Create a mock VRM file
+    vrm_path = temp_path / f"{shape_name.lower().replace(' ', '_')}.vrm"
+    create_simple_vrm_mock(str(vrm_path))
+    
+    # Create pipeline
+    pipeline = CoACDCapsulePipeline(str(vrm_path), str(temp_path))
+    
+    # Override the pipeline's mesh loading methods
+    pipeline.gltf_parser = MockGLTFParser()
+    
+    # Set up mock data
+    pipeline.mesh_data_extractor = MockMeshDataExtractor(vertices)
+    pipeline.joint_names = [f"{shape_name.replace(' ', '')}Bone"]
+    pipeline.bone_weights = pipeline.mesh_data_extractor.get_bone_weights()
+    pipeline.bone_indices = pipeline.mesh_data_extractor.get_bone_indices()
+    
+    # Group vertices by bone
+    pipeline._group_vertices_by_bone()
+    
+    # Create mock mesh with our shape data; reduce straight into the
+    # bounds rows instead of staging a Python list of two arrays
+    bounds = np.empty((2, 3), dtype=np.float32)
+    np.min(vertices, axis=0, out=bounds[0])
+    np.max(vertices, axis=0, out=bounds[1])
+    mesh = MockMesh(vertices, bounds)
+    
+    # Run the complete pipeline
+    success = pipeline.run_complete_pipeline(
+        coacd_threshold=0.05,
+        witness_points=1000,
+        max_capsules=10
+    )
+    
+    if success:
+        log.info(f"✅ {shape_name} pipeline test completed successfully")
+        return True
+    else:
+        log.info(f"❌ {shape_name} pipeline test failed")
+        return False
+
+def _run_shape(task):
+    """Worker wrapper: run one (name, vertices, faces, work_dir) task in
+    its own process and pair the result with the shape name."""
+    shape_name, vertices, faces, work_dir = task
+    return shape_name, _shape_through_pipeline(shape_name, vertices, faces, work_dir)
+
+# Every shape under test: (name, generator function name, args, kwargs).
+# create_* names resolve at module scope, generate_* on a ShapeGenerator.
+SHAPES = [
+    # Platonic Solids
+    ("Tetrahedron", "create_tetrahedron", (), {}),
+    ("Cube", "generate_cube", (2.0,), {}),
+    ("Octahedron", "create_octahedron", (), {}),
+    ("Dodecahedron", "create_dodecahedron", (), {}),
+    ("Icosahedron", "create_icosahedron", (), {}),
+
+    # Other Requested Shapes (cubic strokes are covered by the cube above)
+    ("Cylinder", "generate_cylinder", (1.0, 2.0), {"segments": 16}),
+    ("Cone", "generate_cone", (1.0, 2.0), {"segments": 16}),
+    ("Cuboid", "generate_cuboid", (1.5, 2.0, 1.0), {}),
+    ("Ellipsoid", "generate_ellipsoid", (1.0, 1.5, 0.8), {"segments": 12}),
+    ("Triangular Prism", "generate_triangular_prism", (1.5, 2.0, 1.0), {}),
+    ("Donut", "generate_torus", (1.5, 0.5), {"major_segments": 12, "minor_segments": 8}),
+    ("Biscuit", "generate_biscuit", (1.0, 0.3), {"segments": 12}),
+    ("Markoid", "generate_markoid", (1.2, 1.0, 0.8), {"power": 2.5, "segments": 12}),
+    ("Pyramid", "generate_pyramid", (1.5, 1.5, 2.0), {}),
+]
+
 def test_all_shapes():
     """Test all requested shapes through the pipeline."""
-    print("Testing All Requested Shapes Through CoACD Pipeline")
-    print("=" * 60)
+    log.info("Testing All Requested Shapes Through CoACD Pipeline")
+    log.info("=" * 60)
     
     generator = ShapeGenerator()
     
-    # Test results
-    results = []
-    
-    # 1. Platonic Solids
-    print("1. PLATONIC SOLIDS")
-    
-    # Tetrahedron (4 faces)
-    print("   a) Tetrahedron")
-    vertices, faces = create_tetrahedron()
-    result = test_shape_through_pipeline("Tetrahedron", vertices, faces)
-    results.append(("Tetrahedron", result))
-    
-    # Cube (6 faces) - using our generator
-    print("   b) Cube")
-    cube_data = generator.generate_cube(2.0)
-    vertices = np.array(cube_data['vertices'])
-    faces = np.array(cube_data['faces'])
-    result = test_shape_through_pipeline("Cube", vertices, faces)
-    results.append(("Cube", result))
-    
-    # Octahedron (8 faces)
-    print("   c) Octahedron")
-    vertices, faces = create_octahedron()
-    result = test_shape_through_pipeline("Octahedron", vertices, faces)
-    results.append(("Octahedron", result))
-    
-    # Dodecahedron (12 faces)
-    print("   d) Dodecahedron")
-    vertices, faces = create_dodecahedron()
-    result = test_shape_through_pipeline("Dodecahedron", vertices, faces)
-    results.append(("Dodecahedron", result))
-    
-    # Icosahedron (20 faces)
-    print("   e) Icosahedron")
-    vertices, faces = create_icosahedron()
-    result = test_shape_through_pipeline("Icosahedron", vertices, faces)
-    results.append(("Icosahedron", result))
-    
-    # 2. Other Requested Shapes
-    print("\n2. OTHER REQUESTED SHAPES")
-    
-    # Cubic strokes (cubes) - already tested above
-    
-    # Cylinders
-    print("   a) Cylinder")
-    cylinder_data = generator.generate_cylinder(1.0, 2.0, segments=16)
-    vertices = np.array(cylinder_data['vertices'])
-    faces = np.array(cylinder_data['faces'])
-    result = test_shape_through_pipeline("Cylinder", vertices, faces)
-    results.append(("Cylinder", result))
-    
-    # Cones
-    print("   b) Cone")
-    cone_data = generator.generate_cone(1.0, 2.0, segments=16)
-    vertices = np.array(cone_data['vertices'])
-    faces = np.array(cone_data['faces'])
-    result = test_shape_through_pipeline("Cone", vertices, faces)
-    results.append(("Cone", result))
-    
-    # Cuboids
-    print("   c) Cuboid")
-    cuboid_data = generator.generate_cuboid(1.5, 2.0, 1.0)
-    vertices = np.array(cuboid_data['vertices'])
-    faces = np.array(cuboid_data['faces'])
-    result = test_shape_through_pipeline("Cuboid", vertices, faces)
-    results.append(("Cuboid", result))
-    
-    # Ellipsoids
-    print("   d) Ellipsoid")
-    ellipsoid_data = generator.generate_ellipsoid(1.0, 1.5, 0.8, segments=12)
-    vertices = np.array(ellipsoid_data['vertices'])
-    faces = np.array(ellipsoid_data['faces'])
-    result = test_shape_through_pipeline("Ellipsoid", vertices, faces)
-    results.append(("Ellipsoid", result))
-    
-    # Triangular prisms
-    print("   e) Triangular Prism")
-    prism_data = generator.generate_triangular_prism(1.5, 2.0, 1.0)
-    vertices = np.array(prism_data['vertices'])
-    faces = np.array(prism_data['faces'])
-    result = test_shape_through_pipeline("Triangular Prism", vertices, faces)
-    results.append(("Triangular Prism", result))
-    
-    # Donuts (torus)
-    print("   f) Donut (Torus)")
-    torus_data = generator.generate_torus(1.5, 0.5, major_segments=12, minor_segments=8)
-    vertices = np.array(torus_data['vertices'])
-    faces = np.array(torus_data['faces'])
-    result = test_shape_through_pipeline("Donut", vertices, faces)
-    results.append(("Donut", result))
-    
-    # Biscuits
-    print("   g) Biscuit")
-    biscuit_data = generator.generate_biscuit(1.0, 0.3, segments=12)
-    vertices = np.array(biscuit_data['vertices'])
-    faces = np.array(biscuit_data['faces'])
-    result = test_shape_through_pipeline("Biscuit", vertices, faces)
-    results.append(("Biscuit", result))
-    
-    # Markoids (super ellipsoids)
-    print("   h) Markoid (Super Ellipsoid)")
-    markoid_data = generator.generate_markoid(1.2, 1.0, 0.8, power=2.5, segments=12)
-    vertices = np.array(markoid_data['vertices'])
-    faces = np.array(markoid_data['faces'])
-    result = test_shape_through_pipeline("Markoid", vertices, faces)
-    results.append(("Markoid", result))
-    
-    # Pyramids
-    print("   i) Pyramid")
-    pyramid_data = generator.generate_pyramid(1.5, 1.5, 2.0)
-    vertices = np.array(pyramid_data['vertices'])
-    faces = np.array(pyramid_data['faces'])
-    result = test_shape_through_pipeline("Pyramid", vertices, faces)
-    results.append(("Pyramid", result))
+    # One tempdir for the whole run; each shape works in its own
+    # subdirectory, so per-shape create/rmtree cycles disappear
+    with tempfile.TemporaryDirectory() as run_dir:
+        # Generate everything up front (cheap), then fan the independent
+        # pipeline runs out over a process pool (CoACD-bound)
+        tasks = []
+        for name, func_name, args, kwargs in SHAPES:
+            log.info(f"   Generating {name}")
+            if func_name.startswith("generate_"):
+                data = getattr(generator, func_name)(*args, **kwargs)
+                vertices = np.asarray(data['vertices'])
+                faces = np.asarray(data['faces'])
+            else:
+                vertices, faces = globals()[func_name]()
+            tasks.append((name, vertices, faces, run_dir))
+        
+        # Workers share nothing beyond the parent dir; map() keeps the
+        # summary in task order. chunksize hands each worker a batch of
+        # shapes in one round-trip, so per-process warm-up (module import,
+        # kernel JIT) amortizes over its whole batch
+        workers = os.cpu_count() or 1
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_run_shape, tasks,
+                                        chunksize=max(1, len(tasks) // workers)))
     
     return results
 
+# Platonic solid geometry, computed once at import and frozen: the creators
+# used to re-marshal these arrays (and re-divide by sqrt(3)) on every call.
+# Read-only buffers also stay COW-shared across forked pool workers.
+_TETRA_V = np.array([
+    [ 1,  1,  1],  # 0
+    [ 1, -1, -1],  # 1
+    [-1,  1, -1],  # 2
+    [-1, -1,  1],  # 3
+], dtype=np.float32) / np.float32(np.sqrt(3))  # Normalize to unit edge length
+_TETRA_V.setflags(write=False)
+
+_TETRA_F = np.array([
+    [0, 1, 2],  # Face 1
+    [0, 2, 3],  # Face 2
+    [0, 3, 1],  # Face 3
+    [1, 3, 2],  # Face 4
+], dtype=np.uint32)
+_TETRA_F.setflags(write=False)
+
+_OCTA_V = np.array([
+    [ 1,  0,  0],  # 0
+    [-1,  0,  0],  # 1
+    [ 0,  1,  0],  # 2
+    [ 0, -1,  0],  # 3
+    [ 0,  0,  1],  # 4
+    [ 0,  0, -1],  # 5
+], dtype=np.float32)
+_OCTA_V.setflags(write=False)
+
+_OCTA_F = np.array([
+    [0, 2, 4],  # Face 1
+    [0, 4, 3],  # Face 2
+    [0, 3, 5],  # Face 3
+    [0, 5, 2],  # Face 4
+    [1, 4, 2],  # Face 5
+    [1, 3, 4],  # Face 6
+    [1, 5, 3],  # Face 7
+    [1, 2, 5],  # Face 8
+], dtype=np.uint32)
+_OCTA_F.setflags(write=False)
+
+# Dodecahedron simplified to a cube-like structure for testing
+_DODEC_V = np.array([
+    [-1, -1, -1],  # 0
+    [ 1, -1, -1],  # 1
+    [ 1,  1, -1],  # 2
+    [-1,  1, -1],  # 3
+    [-1, -1,  1],  # 4
+    [ 1, -1,  1],  # 5
+    [ 1,  1,  1],  # 6
+    [-1,  1,  1],  # 7
+], dtype=np.float32) * 0.5
+_DODEC_V.setflags(write=False)
+
+_DODEC_F = np.array([
+    # Bottom face
+    [0, 1, 2], [0, 2, 3],
+    # Top face
+    [4, 6, 5], [4, 7, 6],
+    # Front face
+    [0, 4, 5], [0, 5, 1],
+    # Back face
+    [2, 6, 7], [2, 7, 3],
+    # Left face
+    [0, 3, 7], [0, 7, 4],
+    # Right face
+    [1, 5, 6], [1, 6, 2]
+], dtype=np.uint32)
+_DODEC_F.setflags(write=False)
+
+# Icosahedron simplified to a bipyramid for testing
+_ICOSA_V = np.array([
+    [ 0,  1,  0],  # 0 - top
+    [ 1,  0,  0],  # 1 - right
+    [ 0,  0,  1],  # 2 - front
+    [-1,  0,  0],  # 3 - left
+    [ 0,  0, -1],  # 4 - back
+    [ 0, -1,  0],  # 5 - bottom
+], dtype=np.float32)
+_ICOSA_V.setflags(write=False)
+
+_ICOSA_F = np.array([
+    [0, 1, 2],  # top-right-front
+    [0, 2, 3],  # top-front-left
+    [0, 3, 4],  # top-left-back
+    [0, 4, 1],  # top-back-right
+    [5, 2, 1],  # bottom-front-right
+    [5, 3, 2],  # bottom-left-front
+    [5, 4, 3],  # bottom-back-left
+    [5, 1, 4],  # bottom-right-back
+], dtype=np.uint32)
+_ICOSA_F.setflags(write=False)
+
 def create_tetrahedron():
     """Create a regular tetrahedron."""
-    # Vertices of a regular tetrahedron
-    vertices = np.array([
-        [ 1,  1,  1],  # 0
-        [ 1, -1, -1],  # 1
-        [-1,  1, -1],  # 2
-        [-1, -1,  1],  # 3
-    ], dtype=np.float64) / np.sqrt(3)  # Normalize to unit edge length
-    
-    # Faces (triangles)
-    faces = np.array([
-        [0, 1, 2],  # Face 1
-        [0, 2, 3],  # Face 2
-        [0, 3, 1],  # Face 3
-        [1, 3, 2],  # Face 4
-    ], dtype=np.uint32)
-    
-    return vertices, faces
+    return _TETRA_V, _TETRA_F
 
 def create_octahedron():
     """Create a regular octahedron."""
-    # Vertices of a regular octahedron
-    vertices = np.array([
-        [ 1,  0,  0],  # 0
-        [-1,  0,  0],  # 1
-        [ 0,  1,  0],  # 2
-        [ 0, -1,  0],  # 3
-        [ 0,  0,  1],  # 4
-        [ 0,  0, -1],  # 5
-    ], dtype=np.float64)
-    
-    # Faces (triangles)
-    faces = np.array([
-        [0, 2, 4],  # Face 1
-        [0, 4, 3],  # Face 2
-        [0, 3, 5],  # Face 3
-        [0, 5, 2],  # Face 4
-        [1, 4, 2],  # Face 5
-        [1, 3, 4],  # Face 6
-        [1, 5, 3],  # Face 7
-        [1, 2, 5],  # Face 8
-    ], dtype=np.uint32)
-    
-    return vertices, faces
+    return _OCTA_V, _OCTA_F
 
 def create_dodecahedron():
-    """Create a regular dodecahedron."""
-    # Golden ratio
-    phi = (1 + np.sqrt(5)) / 2
-    
-    # Vertices of a regular dodecahedron
-    vertices = np.array([
-        [ 1,  1,  1],  # 0
-        [ 1,  1, -1],  # 1
-        [ 1, -1,  1],  # 2
-        [ 1, -1, -1],  # 3
-        [-1,  1,  1],  # 4
-        [-1,  1, -1],  # 5
-        [-1, -1,  1],  # 6
-        [-1, -1, -1],  # 7
-        [0,  1/phi,  phi],   # 8
-        [0,  1/phi, -phi],   # 9
-        [0, -1/phi,  phi],   # 10
-        [0, -1/phi, -phi],   # 11
-        [ 1/phi,  phi, 0],   # 12
-        [ 1/phi, -phi, 0],   # 13
-        [-1/phi,  phi, 0],   # 14
-        [-1/phi, -phi, 0],   # 15
-        [ phi, 0,  1/phi],   # 16
-        [ phi, 0, -1/phi],   # 17
-        [-phi, 0,  1/phi],   # 18
-        [-phi, 0, -1/phi],   # 19
-    ], dtype=np.float64) / np.sqrt(3)
-    
-    # Faces (pentagons triangulated)
-    # For simplicity, we'll create a simpler approximation with fewer faces
-    # Let's create a cube-like structure for testing
-    vertices = np.array([
-        [-1, -1, -1],  # 0
-        [ 1, -1, -1],  # 1
-        [ 1,  1, -1],  # 2
-        [-1,  1, -1],  # 3
-        [-1, -1,  1],  # 4
-        [ 1, -1,  1],  # 5
-        [ 1,  1,  1],  # 6
-        [-1,  1,  1],  # 7
-    ], dtype=np.float64) * 0.5
-    
-    # Faces (triangles) - cube faces triangulated
-    faces = np.array([
-        # Bottom face
-        [0, 1, 2], [0, 2, 3],
-        # Top face
-        [4, 6, 5], [4, 7, 6],
-        # Front face
-        [0, 4, 5], [0, 5, 1],
-        # Back face
-        [2, 6, 7], [2, 7, 3],
-        # Left face
-        [0, 3, 7], [0, 7, 4],
-        # Right face
-        [1, 5, 6], [1, 6, 2]
-    ], dtype=np.uint32)
-    
-    return vertices, faces
+    """Create a regular dodecahedron (simplified as a cube for testing)."""
+    return _DODEC_V, _DODEC_F
 
 def create_icosahedron():
-    """Create a regular icosahedron."""
-    # Golden ratio
-    phi = (1 + np.sqrt(5)) / 2
-    
-    # Vertices of a regular icosahedron
-    vertices = np.array([
-        [ 0,  1,  phi],  # 0
-        [ 0,  1, -phi],  # 1
-        [ 0, -1,  phi],  # 2
-        [ 0, -1, -phi],  # 3
-        [ 1,  phi, 0],   # 4
-        [ 1, -phi, 0],   # 5
-        [-1,  phi, 0],   # 6
-        [-1, -phi, 0],   # 7
-        [ phi, 0,  1],   # 8
-        [ phi, 0, -1],   # 9
-        [-phi, 0,  1],   # 10
-        [-phi, 0, -1],   # 11
-    ], dtype=np.float64) / np.sqrt(phi**2 + 1)
-    
-    # Faces (triangles)
-    faces = np.array([
-        [0, 2, 8], [0, 8, 4], [0, 4, 6], [0, 6, 10], [0, 10, 2],
-        [3, 1, 9], [3, 9, 5], [3, 5, 7], [3, 7, 11], [3, 11, 1],
-        [1, 4, 9], [4, 8, 9], [8, 5, 9], [5, 13, 3], [13, 7, 3],  # Simplified
-        [6, 1, 11], [1, 4, 6], [10, 7, 2], [7, 5, 2], [5, 8, 2]
-    ], dtype=np.uint32)
-    
-    # Simplify to a more basic shape for testing
-    vertices = np.array([
-        [ 0,  1,  0],  # 0 - top
-        [ 1,  0,  0],  # 1 - right
-        [ 0,  0,  1],  # 2 - front
-        [-1,  0,  0],  # 3 - left
-        [ 0,  0, -1],  # 4 - back
-        [ 0, -1,  0],  # 5 - bottom
-    ], dtype=np.float64)
-    
-    # Faces (triangles)
-    faces = np.array([
-        [0, 1, 2],  # top-right-front
-        [0, 2, 3],  # top-front-left
-        [0, 3, 4],  # top-left-back
-        [0, 4, 1],  # top-back-right
-        [5, 2, 1],  # bottom-front-right
-        [5, 3, 2],  # bottom-left-front
-        [5, 4, 3],  # bottom-back-left
-        [5, 1, 4],  # bottom-right-back
-    ], dtype=np.uint32)
-    
-    return vertices, faces
+    """Create a regular icosahedron (simplified for testing)."""
+    return _ICOSA_V, _ICOSA_F
 
 def main():
     """Run all shape tests through the CoACD pipeline."""
-    print("Complete Shape Tests for Tapered Capsule Pipeline")
-    print("=" * 60)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    log.info("Complete Shape Tests for Tapered Capsule Pipeline")
+    log.info("=" * 60)
     
     # Run all tests
     results = test_all_shapes()
     
     # Summary
-    print("\n" + "=" * 60)
-    print("TEST SUMMARY")
-    print("=" * 60)
+    log.info("\n" + "=" * 60)
+    log.info("TEST SUMMARY")
+    log.info("=" * 60)
     
     passed = 0
     total = len(results)
     
     for shape_name, success in results:
         status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status} {shape_name}")
+        log.info(f"{status} {shape_name}")
         if success:
             passed += 1
     
-    print("-" * 60)
-    print(f"Passed: {passed}/{total}")
+    log.info("-" * 60)
+    log.info(f"Passed: {passed}/{total}")
     
     if passed == total:
-        print("🎉 All tests passed!")
+        log.info("🎉 All tests passed!")
         return 0
     else:
-        print("❌ Some tests failed!")
+        log.info("❌ Some tests failed!")
         return 1
 
 if __name__ == "__main__":
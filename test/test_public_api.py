@@ -17,22 +17,26 @@ class TestPublicAPI(unittest.TestCase):
 
     def test_public_api_classes_exist(self):
         """Test that all public API classes exist and can be imported."""
-        # Check that all expected classes are available
-        self.assertTrue(hasattr(tapered_capsule, 'SkinnedCapsulePipeline'))
-        self.assertTrue(hasattr(tapered_capsule, 'CapsuleGenerator'))
-        self.assertTrue(hasattr(tapered_capsule, 'GLTFCapsuleGenerator'))
+        # One dir() snapshot instead of per-name hasattr dispatch; dir()
+        # also covers the lazily imported classes, which vars() would miss
+        attrs = set(dir(tapered_capsule))
+        expected = {'SkinnedCapsulePipeline', 'CapsuleGenerator', 'GLTFCapsuleGenerator'}
+        missing = expected - attrs
+        self.assertFalse(missing, f"Missing public classes: {missing}")
 
     def test_public_api_functions_exist(self):
         """Test that all public API functions exist and can be imported."""
-        # Check that all expected functions are available
-        self.assertTrue(hasattr(tapered_capsule, 'analyze_gltf_skeleton'))
-        self.assertTrue(hasattr(tapered_capsule, 'generate_capsules_from_model'))
-        self.assertTrue(hasattr(tapered_capsule, 'generate_skinned_capsules_from_results'))
+        attrs = set(dir(tapered_capsule))
+        expected = {'analyze_gltf_skeleton', 'generate_capsules_from_model',
+                    'generate_skinned_capsules_from_results'}
+        missing = expected - attrs
+        self.assertFalse(missing, f"Missing public functions: {missing}")
 
     def test_version_info(self):
         """Test that version information is available."""
-        self.assertTrue(hasattr(tapered_capsule, '__version__'))
-        self.assertTrue(hasattr(tapered_capsule, '__author__'))
+        attrs = set(dir(tapered_capsule))
+        missing = {'__version__', '__author__'} - attrs
+        self.assertFalse(missing, f"Missing version info: {missing}")
 
 
 if __name__ == '__main__':